@@ -0,0 +1,144 @@
+"""Lambda cold start: import cost of the app and first handler call.
+
+Each run starts a fresh interpreter that imports `src.main`, then sends
+the same API Gateway (HTTP API) event to the Mangum handler twice:
+- import: `import src.main`, i.e. everything done at module load
+- first call: the cold invocation, including anything created lazily
+- warm call: the same request again
+
+A separate `-X importtime` run attributes the import to packages (self
+time summed per top-level package) and to the app's own modules.
+
+The handler is built with lifespan="off" unless --lifespan is given,
+since the lifespan connects to MongoDB and Redis. Needs the same
+settings as the app (MONGO_URI, JWT_SECRET etc.).
+
+    python -m benchmarks.cold_start --runs 5 --path /api/v1/
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+def api_gateway_event(path: str) -> dict:
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": {"host": "localhost", "user-agent": "cold-start"},
+        "requestContext": {
+            "http": {
+                "method": "GET",
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "127.0.0.1",
+                "userAgent": "cold-start",
+            },
+            "requestId": "cold-start",
+            "routeKey": "$default",
+            "stage": "$default",
+        },
+        "isBase64Encoded": False,
+    }
+
+
+def child(path: str, lifespan: bool) -> None:
+    """Runs inside the fresh interpreter; prints timings as JSON."""
+    started = time.perf_counter()
+    import src.main
+    imported = time.perf_counter()
+
+    from mangum import Mangum
+    handler = (src.main.handler if lifespan
+               else Mangum(src.main.app, lifespan="off"))
+
+    timings = {"import_ms": (imported - started) * 1000}
+    for name in ("first_call_ms", "warm_call_ms"):
+        call_started = time.perf_counter()
+        response = handler(api_gateway_event(path), None)
+        timings[name] = (time.perf_counter() - call_started) * 1000
+    timings["status"] = response["statusCode"]
+    print(json.dumps(timings))
+
+
+def run_child(path: str, lifespan: bool) -> dict:
+    command = [sys.executable, "-m", "benchmarks.cold_start", "--child",
+               "--path", path]
+    if lifespan:
+        command.append("--lifespan")
+
+    started = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True,
+                            check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def import_breakdown() -> tuple[dict, list]:
+    """Self time per top-level package and cumulative time of `src.*`
+    modules, in microseconds, from `-X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        capture_output=True, text=True, check=True,
+    )
+
+    packages = defaultdict(int)
+    own_modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, module = line[12:].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        module = module.strip()
+        packages[module.split(".")[0]] += int(self_us)
+        if module.startswith("src."):
+            own_modules.append((module, int(cumulative_us)))
+    return packages, own_modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/api/v1/")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--lifespan", action="store_true",
+                        help="run the app lifespan (needs MongoDB/Redis)")
+    parser.add_argument("--child", action="store_true",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.path, args.lifespan)
+        return
+
+    packages, own_modules = import_breakdown()
+    total = sum(packages.values())
+    print(f"import src.main: {total / 1000:.1f}ms self time in total")
+    print("\nby package (self time):")
+    for package, us in sorted(packages.items(),
+                              key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<28} {us / 1000:8.1f}ms")
+    print("\napp modules (cumulative):")
+    for module, us in sorted(own_modules,
+                             key=lambda item: -item[1])[:args.top]:
+        print(f"  {module:<28} {us / 1000:8.1f}ms")
+
+    runs = [run_child(args.path, args.lifespan) for _ in range(args.runs)]
+    print(f"\nGET {args.path} (status {runs[-1]['status']}), "
+          f"median of {args.runs} fresh processes:")
+    for key in ("process_ms", "import_ms", "first_call_ms",
+                "warm_call_ms"):
+        values = [run[key] for run in runs]
+        print(f"  {key[:-3]:<12} {statistics.median(values):8.1f}ms "
+              f"(min {min(values):.1f}, max {max(values):.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Peak memory and wall-clock time of the pharmacist Excel export.
+
+Compares the old in-memory workbook (`Workbook()` saved to a BytesIO)
+with the write-only workbook used by `write_pharmacists_excel`. Each case
+runs in a fresh interpreter so peak RSS figures do not bleed into each
+other. Runs offline on synthetic rows.
+
+    python -m benchmarks.excel_export --sizes 10000 100000 500000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from openpyxl import Workbook
+
+BATCH_SIZE = 1000
+FIELDS = ["email", "full_name", "fellow", "school_attended",
+          "pcn_license_number", "induction_year", "date_of_birth",
+          "residential_address", "place_of_work", "technical_group",
+          "interest_groups", "gender", "created_at"]
+
+
+def synthetic_batches(count: int):
+    created = datetime(2024, 1, 1)
+    batch = []
+    for i in range(count):
+        batch.append([
+            f"member{i}@example.com", f"Member Number {i}", None,
+            "University of Uyo", f"PCN{i:07d}", 2000 + i % 25,
+            datetime(1980, 1, 1) + timedelta(days=i % 9000),
+            f"{i} Aka Road, Uyo", "General Hospital", "Hospital",
+            "Research, Education", "F" if i % 2 else "M",
+            created + timedelta(seconds=i),
+        ])
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def in_memory(count: int) -> None:
+    wb = Workbook()
+    ws = wb.active
+    ws.append(FIELDS)
+    for batch in synthetic_batches(count):
+        for row in batch:
+            ws.append(row)
+    buffer = BytesIO()
+    wb.save(buffer)
+
+
+def write_only(count: int) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Pharmacists")
+    ws.append(FIELDS)
+    for batch in synthetic_batches(count):
+        for row in batch:
+            ws.append(row)
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        wb.save(path)
+    finally:
+        os.remove(path)
+
+
+MODES = {"in-memory": in_memory, "write-only": write_only}
+
+
+def run_case(mode: str, count: int) -> None:
+    started = time.perf_counter()
+    MODES[mode](count)
+    elapsed = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_kb / 1024}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000, 500_000])
+    parser.add_argument("--modes", nargs="+", default=list(MODES),
+                        choices=list(MODES))
+    parser.add_argument("--case", nargs=2, metavar=("MODE", "ROWS"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case[0], int(args.case[1]))
+        return
+
+    print(f"{'rows':>8} {'mode':<11} {'seconds':>8} {'peak MB':>8}")
+    for size in args.sizes:
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.excel_export",
+                 "--case", mode, str(size)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output)
+            print(f"{size:>8} {mode:<11} {result['seconds']:>8.2f} "
+                  f"{result['peak_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Per-request cost of access token verification.
+
+Times, under the configured JWT_ALGORITHM:
+- python-jose's `jwt.decode` (the old path; skipped if not installed)
+- a PyJWT decode with the prepared key, i.e. a verified-token cache miss
+- `BearerTokenClass.decode_token` on a repeated token, i.e. a cache hit
+
+Runs offline; needs the same settings as the app (JWT_SECRET etc.).
+
+    python -m benchmarks.jwt_decode --rounds 20000
+"""
+import argparse
+import time
+
+import jwt
+
+from src.core.config import Config
+from src.core.security import JWT_KEY, BearerTokenClass
+
+
+def measure(fn, rounds: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20_000)
+    args = parser.parse_args()
+
+    bearer = BearerTokenClass()
+    token = bearer.create_access_token({
+        "user_id": "652c1e6fcf9b7f001f3f5a2b",
+        "email": "member@example.com",
+        "is_admin": True,
+    })
+    algorithms = [Config.JWT_ALGORITHM]
+
+    cases = {}
+    try:
+        from jose import jwt as jose_jwt
+    except ImportError:
+        print("python-jose not installed; skipping the old path")
+    else:
+        cases["python-jose decode"] = lambda: jose_jwt.decode(
+            token, Config.JWT_SECRET, algorithms=algorithms)
+
+    cases["pyjwt decode (miss)"] = lambda: jwt.decode(
+        token, JWT_KEY, algorithms=algorithms)
+    cases["decode_token (hit)"] = lambda: bearer.decode_token(
+        token, token_type="access")
+
+    print(f"algorithm={Config.JWT_ALGORITHM}")
+    for name, fn in cases.items():
+        print(f"{name:<22} {measure(fn, args.rounds):8.2f}us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Per-item cost of serializing list endpoint payloads.
+
+"before" is the old path: `from_mongo` on every document followed by
+FastAPI's default encoding. "after" is what list endpoints now do with
+documents already shaped by `mongo_projection`: one pydantic-core
+`to_json` call. Runs offline on synthetic documents.
+
+    python -m benchmarks.list_serialization --items 50 --rounds 200
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from src.core.responses import RawJSONResponse
+from src.news.schemas import NewsRead
+
+
+def raw_documents(count: int) -> list[dict]:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return [{
+        "_id": ObjectId(),
+        "title": f"Article {i}",
+        "content": "Lorem ipsum dolor sit amet. " * 60,
+        "author": "Secretariat",
+        "image_url": f"https://example.com/{i}.jpg",
+        "slug": f"article-{i}",
+        "tags": ["health", "events"],
+        "group": "general",
+        "created_at": now - timedelta(minutes=i),
+        "updated_at": now - timedelta(minutes=i),
+    } for i in range(count)]
+
+
+def projected_documents(docs: list[dict]) -> list[dict]:
+    return [{**doc, "_id": str(doc["_id"])} for doc in docs]
+
+
+async def before(docs: list[dict]) -> bytes:
+    items = [await NewsRead.from_mongo(n) for n in docs]
+    return json.dumps(jsonable_encoder({"items": items})).encode("utf-8")
+
+
+async def after(docs: list[dict]) -> bytes:
+    return RawJSONResponse({"items": docs}).body
+
+
+async def measure(fn, docs: list[dict], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await fn(docs)
+    elapsed = time.perf_counter() - started
+    return elapsed / (rounds * len(docs)) * 1_000_000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    docs = raw_documents(args.items)
+    shaped = projected_documents(docs)
+
+    before_us = await measure(before, docs, args.rounds)
+    after_us = await measure(after, shaped, args.rounds)
+
+    print(f"before: {before_us:8.2f}us/item")
+    print(f"after:  {after_us:8.2f}us/item "
+          f"({before_us / after_us:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
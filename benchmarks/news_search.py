@@ -0,0 +1,135 @@
+"""Compare the legacy regex news search with the text index search.
+
+Seeds a scratch database with synthetic articles and times both query
+shapes against it. Needs a reachable MongoDB; the scratch database is
+dropped afterwards unless --keep is given.
+
+    python -m benchmarks.news_search --uri mongodb://localhost:27017
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from pymongo import MongoClient, IndexModel
+
+from src.news.models import News
+
+WORDS = [
+    "pharmacy", "pharmacist", "drug", "dosage", "antibiotic", "vaccine",
+    "malaria", "clinic", "hospital", "prescription", "community", "health",
+    "association", "conference", "training", "workshop", "formulary",
+    "supply", "chain", "regulation", "council", "licence", "patient",
+    "safety", "counselling", "research", "student", "fellowship", "award",
+    "election", "budget", "insulin", "diabetes", "hypertension", "outreach",
+    "screening", "awareness", "campaign", "members", "akwa", "ibom", "uyo",
+]
+AUTHORS = ["Admin", "PRO Desk", "Secretariat", "Editorial Team", "Chairman"]
+GROUPS = ["general", "events", "announcements", "health"]
+
+
+def sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def seed(collection, count: int, rng: random.Random) -> None:
+    start = datetime.now(timezone.utc)
+    batch = []
+    for i in range(count):
+        batch.append({
+            "title": sentence(rng, 8).capitalize(),
+            "content": sentence(rng, 250),
+            "author": rng.choice(AUTHORS),
+            "image_url": f"https://example.com/{i}.jpg",
+            "slug": f"article-{i}",
+            "tags": rng.sample(WORDS, 3),
+            "group": rng.choice(GROUPS),
+            "created_at": start - timedelta(minutes=i),
+            "updated_at": start - timedelta(minutes=i),
+        })
+        if len(batch) == 5000:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+
+    collection.create_indexes([
+        index for index in News.Settings.indexes
+        if isinstance(index, IndexModel)
+    ])
+
+
+def regex_search(collection, q: str, limit: int) -> int:
+    filters = {"$or": [
+        {"title": {"$regex": q, "$options": "i"}},
+        {"content": {"$regex": q, "$options": "i"}},
+        {"author": {"$regex": q, "$options": "i"}},
+    ]}
+    total = collection.count_documents(filters)
+    list(collection.find(filters).sort("created_at", -1).limit(limit))
+    return total
+
+
+def text_search(collection, q: str, limit: int) -> int:
+    results = list(collection.aggregate([
+        {"$match": {"$text": {"$search": q}}},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+        {"$sort": {"score": -1, "created_at": -1}},
+        {"$limit": limit},
+    ]))
+    return len(results)
+
+
+def measure(fn, collection, queries: list[str], limit: int) -> list[float]:
+    timings = []
+    for q in queries:
+        started = time.perf_counter()
+        fn(collection, q, limit)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{name:<8} mean={statistics.mean(timings):8.2f}ms "
+          f"p50={statistics.median(timings):8.2f}ms p95={p95:8.2f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="psn_aks_bench")
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    client = MongoClient(args.uri)
+    collection = client[args.db]["news"]
+    collection.drop()
+
+    started = time.perf_counter()
+    seed(collection, args.docs, rng)
+    print(f"seeded {args.docs} articles in "
+          f"{time.perf_counter() - started:.1f}s")
+
+    queries = [" ".join(rng.sample(WORDS, rng.randint(1, 2)))
+               for _ in range(args.queries)]
+
+    try:
+        report("regex", measure(regex_search, collection, queries,
+                                args.limit))
+        report("text", measure(text_search, collection, queries,
+                               args.limit))
+    finally:
+        if not args.keep:
+            client.drop_database(args.db)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Login throughput and event-loop latency with bcrypt on and off the loop.
+
+Simulates a burst of concurrent logins (one `verify_password` each)
+while a background coroutine stands in for other traffic by ticking
+every millisecond. "inline" verifies on the event loop, as login used
+to; "pool" goes through `PWDHashing`'s worker pool. Runs offline.
+
+    python -m benchmarks.password_hashing --logins 32 --rounds 12
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from passlib.context import CryptContext
+
+from src.core.config import Config
+from src.core.security import PWDHashing, get_passwd_context
+
+PASSWORD = "correct horse battery staple"
+
+
+async def other_traffic(stop: asyncio.Event, lags: list[float]) -> None:
+    interval = 0.001
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - started - interval) * 1000)
+
+
+async def run(mode: str, context: CryptContext, logins: int) -> dict:
+    hashed = context.hash(PASSWORD)
+    pwd_hashing = PWDHashing()
+
+    async def login():
+        if mode == "inline":
+            return context.verify(PASSWORD, hashed)
+        return await pwd_hashing._run(context.verify, PASSWORD, hashed)
+
+    stop = asyncio.Event()
+    lags: list[float] = []
+    ticker = asyncio.create_task(other_traffic(stop, lags))
+    await asyncio.sleep(0.01)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    assert all(results)
+
+    lags.sort()
+    return {
+        "logins_per_s": logins / elapsed,
+        "lag_p50_ms": statistics.median(lags),
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1],
+        "lag_max_ms": lags[-1],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    context = get_passwd_context().copy(bcrypt__rounds=args.rounds)
+    print(f"bcrypt rounds={args.rounds}, "
+          f"pool workers={Config.PASSWORD_HASH_WORKERS}")
+    print(f"{'mode':<7} {'logins/s':>9} {'lag p50':>9} {'lag p99':>9} "
+          f"{'lag max':>9}")
+    for mode in ("inline", "pool"):
+        result = await run(mode, context, args.logins)
+        print(f"{mode:<7} {result['logins_per_s']:>9.1f} "
+              f"{result['lag_p50_ms']:>7.1f}ms "
+              f"{result['lag_p99_ms']:>7.1f}ms "
+              f"{result['lag_max_ms']:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+"""Latency of the in-process pharmacist trigram search.
+
+Builds `PharmacistSearchIndex` from synthetic members (no database) and
+times a mix of exact, partial and misspelled queries.
+
+    python -m benchmarks.pharmacist_search --members 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from src.pharmacists.search import PharmacistSearchIndex
+
+FIRST = ["Aniekan", "Imaobong", "Ekemini", "Uduak", "Nsikak", "Ime",
+         "Mfon", "Emem", "Blessing", "Grace", "Samuel", "Victor",
+         "Kufre", "Idongesit", "Ubong", "Edidiong", "Daniel", "Joy"]
+LAST = ["Etuk", "Udo", "Akpan", "Essien", "Okon", "Bassey", "Umoh",
+        "Ekpo", "Inyang", "Effiong", "Obot", "Archibong", "Williams"]
+WORKPLACES = ["University of Uyo Teaching Hospital", "General Hospital",
+              "St. Luke's Hospital", "Emmanuel Pharmacy", "HealthPlus",
+              "Ibom Specialist Hospital", "Primary Health Centre"]
+SCHOOLS = ["University of Uyo", "University of Lagos", "University of "
+           "Nigeria", "Obafemi Awolowo University", "University of Benin"]
+
+QUERIES = ["Aniekan Etuk", "aniekn etk", "Imaobong", "Archibng",
+           "teaching hospital", "Emmanuel Pharmcy", "univ of lagos", "Ed"]
+
+
+def synthetic_members(count: int):
+    rng = random.Random(42)
+    for i in range(count):
+        yield {
+            "_id": f"{i:024x}",
+            "full_name": (f"{rng.choice(FIRST)} {rng.choice(FIRST)} "
+                          f"{rng.choice(LAST)}"),
+            "pcn_license_number": f"PCN{i:07d}",
+            "technical_group": "Hospital",
+            "place_of_work": f"{rng.choice(WORKPLACES)} {i % 50}",
+            "school_attended": rng.choice(SCHOOLS),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    index = PharmacistSearchIndex()
+    started = time.perf_counter()
+    index.load(synthetic_members(args.members))
+    print(f"built {index.size} members in "
+          f"{time.perf_counter() - started:.2f}s")
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            results = index.search(query, limit=20)
+            timings.append((time.perf_counter() - started) * 1000)
+        top = results[0]["full_name"] if results else "-"
+        print(f"{query!r:<22} median {statistics.median(timings):6.2f}ms "
+              f"max {max(timings):6.2f}ms  top: {top}")
+
+
+if __name__ == "__main__":
+    main()
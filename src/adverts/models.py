@@ -35,6 +35,7 @@ class Advert(Document):
     class Settings:
         name = "adverts"
         indexes = [
+            "uid",
             "title",
             "active",
             "priority",
@@ -10,8 +10,11 @@ from fastapi import (
     Query,
     Form,
     File,
+    Depends,
 )
 
+from src.core.cache import response_cache
+from src.core.conditional import ConditionalGet
 from .schemas import AdvertRead, AdvertUpdate
 from .services import adverts_svc
 
@@ -19,7 +22,26 @@ from .services import adverts_svc
 adverts_router = APIRouter()
 
 
-@adverts_router.get("/", response_model=List[AdvertRead])
+async def _advert_version(request: Request):
+    try:
+        advert_uid = uuid.UUID(request.path_params["advert_uid"])
+    except ValueError:
+        return None
+    return await adverts_svc.get_advert_version(advert_uid)
+
+
+adverts_list_conditional = ConditionalGet(
+    lambda request: adverts_svc.get_adverts_version(
+        only_active=request.query_params.get("only_active", "").lower()
+        in ("1", "true", "yes", "on"),
+    )
+)
+advert_detail_conditional = ConditionalGet(_advert_version)
+
+
+@adverts_router.get("/", response_model=List[AdvertRead],
+                    dependencies=[Depends(adverts_list_conditional)])
+@response_cache.cached("adverts", ttl=60)
 async def list_adverts(
     request: Request,
     only_active: bool = Query(
@@ -36,7 +58,8 @@ async def list_adverts(
     return adverts_list
 
 
-@adverts_router.get("/{advert_uid}", response_model=AdvertRead)
+@adverts_router.get("/{advert_uid}", response_model=AdvertRead,
+                    dependencies=[Depends(advert_detail_conditional)])
 async def get_advert(
     request: Request,
     advert_uid: uuid.UUID,
@@ -1,15 +1,82 @@
+import bisect
 import uuid
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 
 from fastapi import HTTPException, status
 
 from src.adverts.models import Advert
+from src.core.cache import response_cache
+from src.core.conditional import (
+    ResourceVersion, document_version, list_versions
+)
 from src.utils.cloudinary import upload_to_cloudinary
 
 
 class AdvertsService:
 
+    def build_filters(self, only_active: bool = False) -> dict:
+
+        if not only_active:
+            return {}
+
+        now = datetime.now(timezone.utc)
+
+        return {
+            "active": True,
+            "$and": [
+                {
+                    "$or": [
+                        {"start_date": None},
+                        {"start_date": {"$lte": now}},
+                    ]
+                },
+                {
+                    "$or": [
+                        {"end_date": None},
+                        {"end_date": {"$gte": now}},
+                    ]
+                },
+            ],
+        }
+
+    async def activity_boundaries(self) -> dict:
+        """Every start and end date, as timestamps, stored with the
+        adverts generation: the active list only changes when the clock
+        passes one of them."""
+        adverts = await Advert.get_pymongo_collection().find(
+            {"active": True}, {"start_date": 1, "end_date": 1}
+        ).to_list(None)
+
+        boundaries = sorted({
+            # Stored as naive UTC.
+            advert[field].replace(tzinfo=timezone.utc).timestamp()
+            for advert in adverts
+            for field in ("start_date", "end_date")
+            if advert.get(field) is not None
+        })
+        return {"boundaries": boundaries}
+
+    async def get_adverts_version(
+        self,
+        only_active: bool = False
+    ) -> ResourceVersion:
+        if not only_active:
+            return await list_versions.version("adverts")
+
+        entry = await list_versions.get("adverts")
+        passed = bisect.bisect_right(
+            entry.get("boundaries", []),
+            datetime.now(timezone.utc).timestamp()
+        )
+        return await list_versions.version("adverts", "active", passed)
+
+    async def get_advert_version(
+        self,
+        advert_uid: uuid.UUID
+    ) -> Optional[ResourceVersion]:
+        return await document_version(Advert, Advert.uid == advert_uid)
+
     async def get_all_adverts(
         self,
         offset: int = 0,
@@ -17,30 +84,7 @@ class AdvertsService:
         only_active: bool = False
     ) -> List[Advert]:
 
-        query = Advert.find()
-
-        if only_active:
-            now = datetime.now(timezone.utc)
-
-            query = Advert.find(
-                {
-                    "active": True,
-                    "$and": [
-                        {
-                            "$or": [
-                                {"start_date": None},
-                                {"start_date": {"$lte": now}},
-                            ]
-                        },
-                        {
-                            "$or": [
-                                {"end_date": None},
-                                {"end_date": {"$gte": now}},
-                            ]
-                        },
-                    ],
-                }
-            )
+        query = Advert.find(self.build_filters(only_active))
 
         return (
             await query
@@ -95,6 +139,8 @@ class AdvertsService:
         )
 
         await advert.insert()
+        await response_cache.invalidate("adverts")
+        await list_versions.bump("adverts")
         return advert
 
     async def update_one_advert(self, advert_uid, data):
@@ -111,6 +157,8 @@ class AdvertsService:
 
         advert.updated_at = datetime.now(timezone.utc)
         await advert.save()
+        await response_cache.invalidate("adverts")
+        await list_versions.bump("adverts")
         return advert
 
     async def delete_one_advert(self, advert_uid):
@@ -122,6 +170,9 @@ class AdvertsService:
             )
 
         await advert.delete()
+        await response_cache.invalidate("adverts")
+        await list_versions.bump("adverts")
 
 
 adverts_svc = AdvertsService()
+list_versions.register("adverts", adverts_svc.activity_boundaries)
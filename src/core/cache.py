@@ -0,0 +1,188 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from src.core.config import Config
+from src.core.metrics import record_cache_lookup
+
+logger = logging.getLogger("psnaks")
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            self._entries.pop(key, None)
+
+
+class RedisCacheBackend:
+    """Shared cache stored as JSON strings in Redis.
+
+    Redis failures are logged and treated as cache misses so that an
+    unavailable Redis never takes the API down with it.
+    """
+
+    def __init__(self, client, prefix: str = "cache"):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        from redis.exceptions import RedisError
+
+        try:
+            raw = await self.client.get(self._key(key))
+        except RedisError as e:
+            logger.warning("Redis cache read failed: %s", e)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        from redis.exceptions import RedisError
+
+        try:
+            await self.client.set(self._key(key), json.dumps(value), ex=ttl)
+        except RedisError as e:
+            logger.warning("Redis cache write failed: %s", e)
+
+    async def delete(self, key: str) -> None:
+        from redis.exceptions import RedisError
+
+        try:
+            await self.client.delete(self._key(key))
+        except RedisError as e:
+            logger.warning("Redis cache delete failed: %s", e)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        from redis.exceptions import RedisError
+
+        try:
+            keys = [k async for k in self.client.scan_iter(
+                match=f"{self._key(prefix)}*", count=500)]
+            if keys:
+                await self.client.delete(*keys)
+        except RedisError as e:
+            logger.warning("Redis cache invalidation failed: %s", e)
+
+
+def create_cache_backend(backend: str, prefix: str = "cache"):
+    if backend == "redis":
+        from src.db.redis import get_redis_client
+        return RedisCacheBackend(get_redis_client(), prefix=prefix)
+    if backend == "memory":
+        return MemoryCacheBackend(max_entries=Config.CACHE_MAX_ENTRIES)
+    return None
+
+
+class ResponseCache:
+    """Caches JSON-encoded responses of public GET endpoints.
+
+    Entries are keyed by namespace, path and sorted query parameters, so
+    a service can drop everything it may have affected with a single
+    `invalidate(namespace)` call from its write paths.
+    """
+
+    def __init__(self, backend, ttl: int = 300):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def build_key(namespace: str, request: Request) -> str:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        key = f"{namespace}:{request.url.path}?{query}"
+        # Set by ConditionalGet: an entry never outlives the version its
+        # ETag was sent with.
+        version = getattr(request.state, "resource_version", None)
+        if version is not None:
+            key = f"{key}#{version.etag}"
+        return key
+
+    def cached(self, namespace: str, ttl: Optional[int] = None):
+        """Cache the decorated route; it must accept `request: Request`.
+
+        Routes returning a Response directly are cached by body; they
+        should also accept `response: Response` so headers set by their
+        dependencies survive a cache hit.
+        """
+
+        def decorator(func):
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return await func(*args, **kwargs)
+
+                key = self.build_key(namespace, kwargs["request"])
+                hit = await self.backend.get(key)
+                record_cache_lookup(namespace, hit is not None)
+                if hit is not None:
+                    kind, value = hit
+                    if kind == "raw":
+                        sub_response = kwargs.get("response")
+                        return Response(
+                            content=value,
+                            media_type="application/json",
+                            headers=(dict(sub_response.headers)
+                                     if sub_response is not None else None)
+                        )
+                    return value
+
+                result = await func(*args, **kwargs)
+                if isinstance(result, Response):
+                    entry = ("raw", result.body.decode("utf-8"))
+                else:
+                    entry = ("json", jsonable_encoder(result))
+                await self.backend.set(key, entry, ttl or self.ttl)
+                return result
+
+            return wrapper
+
+        return decorator
+
+    async def invalidate(self, *namespaces: str) -> None:
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            await self.backend.delete_prefix(f"{namespace}:")
+
+
+response_cache = ResponseCache(
+    backend=create_cache_backend(Config.CACHE_BACKEND),
+    ttl=Config.CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,214 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+
+from beanie import Document, PydanticObjectId
+from fastapi import HTTPException, Request, Response, status
+from pydantic import BaseModel, Field
+from pymongo import ReturnDocument
+
+from src.core.cache import create_cache_backend
+from src.core.config import Config
+
+
+@dataclass
+class ResourceVersion:
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+class VersionProjection(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    updated_at: datetime
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def make_version(*parts,
+                 last_modified: Optional[datetime] = None
+                 ) -> ResourceVersion:
+    digest = hashlib.sha1(
+        "|".join(str(p) for p in parts).encode("utf-8")
+    ).hexdigest()
+    if last_modified is not None:
+        last_modified = _as_utc(last_modified)
+    return ResourceVersion(etag=f'W/"{digest}"', last_modified=last_modified)
+
+
+async def document_version(
+    model,
+    *filters,
+    projection_model: type[VersionProjection] = VersionProjection
+) -> Optional[ResourceVersion]:
+    """Version of a single document, read without fetching its body.
+
+    Every field of `projection_model` feeds the ETag, so subclasses can
+    add fields that change the representation without touching
+    `updated_at`.
+    """
+    doc = await model.find_one(*filters, projection_model=projection_model)
+    if doc is None:
+        return None
+    return make_version(*doc.model_dump().values(),
+                        last_modified=doc.updated_at)
+
+
+class ListGeneration(Document):
+    """Write counter of one list namespace ("news", "adverts", ...).
+
+    The document id is the namespace itself.
+    """
+    id: str
+    generation: int = 0
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
+
+    class Settings:
+        name = "list_generations"
+
+
+class ListVersions:
+    """Versions of list endpoints that cost no query to check.
+
+    Every write to a namespace bumps its generation in MongoDB, next to
+    the response cache invalidation, so the version changes on inserts,
+    updates and deletes alike. Reads take the generation from the cache
+    backend and only fall back to MongoDB on a miss, so a warm
+    conditional GET does not touch the database. With the memory
+    backend other processes see a bump once their entry expires, the
+    same staleness as their cached responses.
+
+    `register` attaches extra fields recomputed on each bump, for lists
+    whose contents also change with time (see the adverts window).
+    """
+
+    def __init__(self, backend, ttl: int = 300):
+        self.backend = backend
+        self.ttl = ttl
+        self._extras: dict[str, Callable[[], Awaitable[dict]]] = {}
+
+    def register(self, namespace: str,
+                 extra: Callable[[], Awaitable[dict]]) -> None:
+        self._extras[namespace] = extra
+
+    @staticmethod
+    def _entry(doc: dict) -> dict:
+        entry = {key: value for key, value in doc.items() if key != "_id"}
+        entry["updated_at"] = _as_utc(doc["updated_at"]).isoformat()
+        return entry
+
+    async def bump(self, *namespaces: str) -> None:
+        collection = ListGeneration.get_pymongo_collection()
+        for namespace in namespaces:
+            fields = {"updated_at": datetime.now(timezone.utc)}
+            extra = self._extras.get(namespace)
+            if extra is not None:
+                fields.update(await extra())
+
+            doc = await collection.find_one_and_update(
+                {"_id": namespace},
+                {"$inc": {"generation": 1}, "$set": fields},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            if self.backend is not None:
+                await self.backend.set(namespace, self._entry(doc), self.ttl)
+
+    async def current(self, namespace: str) -> dict:
+        """The generation as stored in MongoDB, bypassing the cache."""
+        doc = await ListGeneration.get_pymongo_collection().find_one(
+            {"_id": namespace}
+        )
+        if doc is None:
+            await self.bump(namespace)
+            doc = await ListGeneration.get_pymongo_collection().find_one(
+                {"_id": namespace}
+            )
+        return self._entry(doc)
+
+    async def get(self, namespace: str) -> dict:
+        if self.backend is not None:
+            cached = await self.backend.get(namespace)
+            if cached is not None:
+                return cached
+
+        entry = await self.current(namespace)
+        if self.backend is not None:
+            await self.backend.set(namespace, entry, self.ttl)
+        return entry
+
+    async def version(self, namespace: str, *parts) -> ResourceVersion:
+        entry = await self.get(namespace)
+        updated_at = datetime.fromisoformat(entry["updated_at"])
+        return make_version(namespace, entry["generation"], *parts,
+                            last_modified=updated_at)
+
+
+list_versions = ListVersions(
+    backend=create_cache_backend(Config.CACHE_BACKEND, prefix="versions"),
+    ttl=Config.CACHE_TTL_SECONDS,
+)
+
+
+def is_not_modified(request: Request, version: ResourceVersion) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = {tag.strip().removeprefix("W/")
+                      for tag in if_none_match.split(",")}
+        return ("*" in candidates
+                or version.etag.removeprefix("W/") in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and version.last_modified is not None:
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        return version.last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+class ConditionalGet:
+    """Route dependency answering conditional GETs with 304 Not Modified.
+
+    `resolver` receives the request and returns the current version of
+    the resource, or None when it does not exist so the route can raise
+    its usual 404. The check runs before the route body, so a match
+    skips fetching and serializing the full documents entirely.
+    The version is also left on `request.state` for `ResponseCache`.
+    """
+
+    def __init__(self,
+                 resolver: Callable[[Request],
+                                    Awaitable[Optional[ResourceVersion]]]):
+        self.resolver = resolver
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        version = await self.resolver(request)
+        if version is None:
+            return
+
+        headers = {"ETag": version.etag, "Cache-Control": "no-cache"}
+        if version.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                version.last_modified.replace(microsecond=0), usegmt=True
+            )
+
+        # Lets the response cache key its entries by version.
+        request.state.resource_version = version
+
+        if is_not_modified(request, version):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=headers
+            )
+
+        response.headers.update(headers)
@@ -8,9 +8,21 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str
 
     REDIS_URL: str = "redis://localhost:6379/0"
+    BLOCKLIST_RESYNC_SECONDS: int = 300
+    BLOCKLIST_SYNC_TIMEOUT_SECONDS: float = 2.0
     ENVIRONMENT: str = "dev"
     ACCESS_TOKEN_EXPIRY: int = 1800
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_CACHE_MAX_ENTRIES: int = 4096
+
+    PASSWORD_HASH_WORKERS: int = 4
+    # Comma-separated; new hashes use the first, the rest are upgraded
+    # on login.
+    PASSWORD_SCHEMES: str = "bcrypt"
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_ARGON2_TIME_COST: int = 3
+    PASSWORD_ARGON2_MEMORY_COST: int = 65536
+    PASSWORD_ARGON2_PARALLELISM: int = 4
 
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
@@ -33,6 +45,59 @@ class Settings(BaseSettings):
 
     FRONTEND_DOMAIN: str
 
+    VERIFY_INDEXES_ON_STARTUP: bool = False
+    SLOW_QUERY_MS: int = 100
+    SLOW_QUERY_EXPLAIN: bool = False
+
+    # Fraction of requests written to the access log; 5xx responses and
+    # requests slower than ACCESS_LOG_SLOW_MS are always logged.
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_SLOW_MS: int = 1000
+    # The metrics endpoint requires "Authorization: Bearer <token>" and
+    # answers 404 while no token is set.
+    METRICS_TOKEN: str = ""
+    # When set, each request is also logged as a CloudWatch EMF record
+    # in this namespace (one stdout line per request).
+    METRICS_EMF_NAMESPACE: str = ""
+    # Admins can profile a request with "X-Profile: return|store".
+    # cProfile also slows every request running alongside on the same
+    # event loop, so leave this off unless investigating.
+    PROFILING_ENABLED: bool = False
+    # Stored profiles are served by GET /api/v1/profiles/<id>.
+    PROFILE_STORAGE_BACKEND: str = "gridfs"
+    PROFILE_STORAGE_DIR: str = "/tmp/psnaks-profiles"
+    PROFILE_STORAGE_BUCKET: str = "profiles"
+
+    NEWS_SEARCH_MAX_TIME_MS: int = 500
+
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_MAX_ENTRIES: int = 1024
+
+    # Shared, so dropping a changed or deleted user's entry takes effect
+    # in every process at once; a per-process "memory" cache keeps a
+    # demoted admin authorized elsewhere for up to the TTL.
+    PRINCIPAL_CACHE_BACKEND: str = "redis"
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    EXPORT_EXCEL_IN_THREADPOOL: bool = True
+    # "worker": jobs wait for `python -m src.pharmacists.jobs` (or the
+    # scheduled exportWorker function); "inline" runs them as a task in
+    # the API process, which only suits a long-lived local server.
+    EXPORT_WORKER_MODE: str = "worker"
+    # Jobs still "running" with no progress for this long are requeued.
+    EXPORT_JOB_STALE_MINUTES: int = 15
+    # Finished jobs and their files (which hold members' personal data)
+    # are deleted by the worker this long after their last update.
+    EXPORT_RETENTION_HOURS: int = 24
+    # "gridfs" lets any process serve an export; "local" keeps it in
+    # EXPORT_STORAGE_DIR on the machine that ran the job.
+    EXPORT_STORAGE_BACKEND: str = "gridfs"
+    EXPORT_STORAGE_DIR: str = "/tmp/psnaks-exports"
+    EXPORT_STORAGE_BUCKET: str = "exports"
+
+    PHARMACIST_SEARCH_REFRESH_SECONDS: int = 300
+
     model_config = SettingsConfigDict(
         env_file=".env",
         extra="ignore"
@@ -1,9 +1,9 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from src.users.models import User
+from src.users.schemas import UserPrincipal
 from src.core.security import BearerTokenClass
-# from src.db.redis import token_in_blocklist
+from src.db.redis import token_blocklist
 from src.users.services import user_svc
 
 
@@ -18,7 +18,6 @@ def get_token_details(request: Request,
                       ) -> dict:
 
     token = request.cookies.get("access_token")
-    print("token in cookies: ", token)
     if not token and credentials:
         token = credentials.credentials
 
@@ -53,21 +52,28 @@ def get_token_details(request: Request,
 #     return token_details
 
 
-async def get_current_user(token_details: dict = Depends(get_token_details)):
-    # if await token_in_blocklist(token_details['jti']):
-    #     raise HTTPException(
-    #         detail="Token has been revoked. Please log in again.",
-    #         status_code=status.HTTP_401_UNAUTHORIZED
-    #     )
-    user_email = token_details['email']
-    if not user_email:
+async def get_current_user(request: Request,
+                           token_details: dict = Depends(get_token_details)):
+    if await token_blocklist.is_revoked(token_details.get('jti')):
+        raise HTTPException(
+            detail="Token has been revoked. Please log in again.",
+            status_code=status.HTTP_401_UNAUTHORIZED
+        )
+    user_id = token_details.get('sub')
+    if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload"
         )
 
-    user = await user_svc.get_existing_user_by_email(user_email)
-    print(user)
+    user = await user_svc.get_principal(user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found or inactive"
+        )
+    # Picked up by the access log.
+    request.state.user_id = user_id
     return user
 
 
@@ -85,7 +91,9 @@ async def get_current_user(token_details: dict = Depends(get_token_details)):
 #         )
 
 
-async def require_admin(current_user: User = Depends(get_current_user)):
+async def require_admin(
+    current_user: UserPrincipal = Depends(get_current_user)
+):
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,259 @@
+"""In-process metrics rendered in the Prometheus text format.
+
+Each process keeps its own counters; the scraper or the dashboard
+aggregates across instances. Label sets are kept small on purpose:
+routes are recorded by template, never by raw path.
+
+Behind API Gateway a scrape reaches whichever Lambda container serves
+it, so /metrics only shows that container's counters. For a fleet-wide
+view there, set METRICS_EMF_NAMESPACE: every request is also written
+to stdout as a CloudWatch Embedded Metric Format record, which
+CloudWatch aggregates across containers.
+"""
+import bisect
+import hmac
+import json
+import sys
+import threading
+import time
+from typing import Iterable, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Response, status
+
+from src.core.config import Config
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\")
+                         .replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str,
+                 labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        # Driver callbacks can run on Motor's executor threads.
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}",
+                 f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} "
+            f"{_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str,
+                 labels: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, amount: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, amount)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum.
+                state = self._values[key] = [
+                    [0] * (len(self.buckets) + 1), 0.0
+                ]
+            state[0][index] += 1
+            state[1] += amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(
+                (key, (list(counts), total))
+                for key, (counts, total) in self._values.items()
+            )
+
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(self.labels, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(),
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(
+            Histogram(name, documentation, labels, buckets)
+        )
+
+    def render(self) -> str:
+        return "\n".join(
+            metric.render() for metric in self._metrics.values()
+        ) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests handled.",
+    ("method", "route", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency.",
+    ("method", "route"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled.",
+)
+
+mongo_commands = registry.counter(
+    "mongodb_commands_total", "MongoDB commands sent.",
+    ("command", "outcome"),
+)
+mongo_command_duration = registry.histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency.",
+    ("command",),
+)
+mongo_commands_per_request = registry.histogram(
+    "mongodb_commands_per_request", "MongoDB commands sent per request.",
+    ("route",), buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+mongo_time_per_request = registry.histogram(
+    "mongodb_time_per_request_seconds",
+    "Time spent waiting on MongoDB per request.", ("route",),
+)
+
+cache_requests = registry.counter(
+    "cache_requests_total", "Cache lookups by cache and result.",
+    ("cache", "result"),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def emit_emf_request(method: str, route: str, status_code: int,
+                     seconds: float, db_commands: int,
+                     db_seconds: float) -> None:
+    """Write one request as a CloudWatch EMF record on stdout."""
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": Config.METRICS_EMF_NAMESPACE,
+                "Dimensions": [["Route", "Method"]],
+                "Metrics": [
+                    {"Name": "Latency", "Unit": "Milliseconds"},
+                    {"Name": "MongoCommands", "Unit": "Count"},
+                    {"Name": "MongoTime", "Unit": "Milliseconds"},
+                    {"Name": "Errors", "Unit": "Count"},
+                ],
+            }],
+        },
+        "Route": route,
+        "Method": method,
+        "Status": status_code,
+        "Latency": round(seconds * 1000, 3),
+        "MongoCommands": db_commands,
+        "MongoTime": round(db_seconds * 1000, 3),
+        "Errors": int(status_code >= 500),
+    }
+    sys.stdout.write(json.dumps(record) + "\n")
+
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+def metrics(authorization: Optional[str] = Header(default=None)):
+    if not Config.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    expected = f"Bearer {Config.METRICS_TOKEN}"
+    if not hmac.compare_digest(authorization or "", expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token"
+        )
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,106 @@
+"""Pick password hashing costs that hit a target latency on this host.
+
+Hashing time depends on the CPU share the process gets; on Lambda that
+scales with the configured memory size, so run this inside a function
+(or container) sized like production:
+
+    python -m src.core.password_calibration --scheme bcrypt --target-ms 250
+    python -m src.core.password_calibration --scheme argon2 \\
+        --memory-kib 65536 --parallelism 1
+
+The chosen cost is printed as the environment variables to set. Raising
+a cost takes effect on each user's next login, when
+`PWDHashing.verify_and_update` rehashes the password.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from src.core.security import build_passwd_context
+
+PASSWORD = "calibration-password"
+
+BCRYPT_ROUNDS = range(8, 17)
+ARGON2_TIME_COSTS = range(1, 11)
+
+
+def measure(context, samples: int) -> float:
+    """Median milliseconds to hash one password with `context`."""
+    context.hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash(PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(scheme: str, costs, target_ms: float, samples: int,
+              **settings) -> tuple[int | None, list[tuple[int, float]]]:
+    """Highest cost whose median hash time stays within `target_ms`."""
+    chosen, results = None, []
+    for cost in costs:
+        context = build_passwd_context(
+            [scheme], **{f"{scheme}__rounds": cost}, **settings
+        )
+        elapsed = measure(context, samples)
+        results.append((cost, elapsed))
+        if elapsed > target_ms:
+            break
+        chosen = cost
+    return chosen, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Calibrate password hashing cost to a target latency.")
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"],
+                        default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--memory-kib", type=int, default=65536,
+                        help="argon2 memory cost")
+    parser.add_argument("--parallelism", type=int, default=4,
+                        help="argon2 lanes")
+    args = parser.parse_args()
+
+    memory = os.environ.get("AWS_LAMBDA_FUNCTION_MEMORY_SIZE")
+    print(f"host cpus={os.cpu_count()}"
+          + (f", lambda memory={memory}MB" if memory else ""))
+
+    if args.scheme == "bcrypt":
+        label = "rounds"
+        chosen, results = calibrate("bcrypt", BCRYPT_ROUNDS,
+                                    args.target_ms, args.samples)
+        env = {"PASSWORD_BCRYPT_ROUNDS": chosen}
+    else:
+        label = "time_cost"
+        chosen, results = calibrate(
+            "argon2", ARGON2_TIME_COSTS, args.target_ms, args.samples,
+            argon2__memory_cost=args.memory_kib,
+            argon2__parallelism=args.parallelism,
+        )
+        env = {
+            "PASSWORD_ARGON2_TIME_COST": chosen,
+            "PASSWORD_ARGON2_MEMORY_COST": args.memory_kib,
+            "PASSWORD_ARGON2_PARALLELISM": args.parallelism,
+        }
+
+    for cost, elapsed in results:
+        print(f"{args.scheme} {label}={cost:<3} {elapsed:8.1f}ms")
+
+    if chosen is None:
+        print(f"Even the lowest {label} exceeds {args.target_ms:.0f}ms; "
+              "raise the target or lower the memory cost.")
+        return
+
+    print(f"\nWithin {args.target_ms:.0f}ms:")
+    print(f"PASSWORD_SCHEMES={args.scheme}"
+          + (",bcrypt" if args.scheme == "argon2" else ""))
+    for key, value in env.items():
+        print(f"{key}={value}")
+
+
+if __name__ == "__main__":
+    main()
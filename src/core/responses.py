@@ -0,0 +1,48 @@
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+class RawJSONResponse(Response):
+    """JSON response for documents already shaped by a `$project` stage.
+
+    Serializes straight to bytes with pydantic-core, skipping model
+    construction and `jsonable_encoder`.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content, fallback=str)
+
+
+def raw_json_response(content: Any,
+                      response: Optional[Response] = None
+                      ) -> RawJSONResponse:
+    """Build a RawJSONResponse keeping headers that route dependencies
+    (e.g. ETags) set on the injected `response`."""
+    headers = dict(response.headers) if response is not None else None
+    return RawJSONResponse(content, headers=headers)
+
+
+def mongo_projection(schema: type[BaseModel], **overrides) -> dict:
+    """`$project` spec producing documents shaped like `schema` dumps.
+
+    `_id` is stringified server-side and optional fields fall back to
+    their defaults, so the result can be serialized without validation.
+    """
+    projection = {}
+    for name, field in schema.model_fields.items():
+        key = field.alias or name
+        if key == "_id":
+            projection[key] = {"$toString": "$_id"}
+        elif field.is_required():
+            projection[key] = f"${name}"
+        else:
+            default = field.get_default(call_default_factory=True)
+            projection[key] = {"$ifNull": [f"${name}", default]}
+
+    projection.update(overrides)
+    return projection
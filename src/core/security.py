@@ -1,27 +1,143 @@
+import asyncio
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 import uuid
+import jwt
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
-from jose import jwt, JWTError, ExpiredSignatureError
 from src.core.config import Config
+from src.core.metrics import record_cache_lookup
 
-passwd_context = CryptContext(
-    schemes=['bcrypt']
-)
+
+def build_passwd_context(schemes: list[str] | None = None, **settings):
+    """CryptContext for PASSWORD_SCHEMES.
+
+    New hashes use the first scheme; the others are only verified and
+    marked deprecated, as are hashes below the configured cost, so
+    `verify_and_update` rehashes them on the next successful login.
+    """
+    from passlib.context import CryptContext
+
+    if schemes is None:
+        schemes = [s.strip() for s in Config.PASSWORD_SCHEMES.split(",")
+                   if s.strip()]
+
+    costs = {
+        "bcrypt__rounds": Config.PASSWORD_BCRYPT_ROUNDS,
+        "argon2__rounds": Config.PASSWORD_ARGON2_TIME_COST,
+        "argon2__memory_cost": Config.PASSWORD_ARGON2_MEMORY_COST,
+        "argon2__parallelism": Config.PASSWORD_ARGON2_PARALLELISM,
+    }
+    costs.update(settings)
+    for scheme in ("bcrypt", "argon2"):
+        costs.setdefault(f"{scheme}__min_rounds", costs[f"{scheme}__rounds"])
+    costs = {key: value for key, value in costs.items()
+             if key.split("__")[0] in schemes}
+
+    return CryptContext(schemes=schemes, deprecated="auto", **costs)
+
+
+@functools.cache
+def get_passwd_context():
+    """The app's CryptContext, built (and passlib imported) on first use
+    so only the routes that hash passwords pay for it."""
+    return build_passwd_context()
 
 
 DEFAULT_EXPIRY_ACCESS = timedelta(seconds=Config.ACCESS_TOKEN_EXPIRY)
 DEFAULT_EXPIRY_REFRESH = timedelta(days=Config.REFRESH_TOKEN_EXPIRE_DAYS)
 
+# Prepared once instead of on every encode/decode.
+JWT_KEY = jwt.get_algorithm_by_name(Config.JWT_ALGORITHM).prepare_key(
+    Config.JWT_SECRET
+)
+
 
 class PWDHashing:
-    def generate_password_hash(self, password: str) -> str:
-        hash = passwd_context.hash(password)
-        return hash
+    """bcrypt hashing run on a bounded thread pool.
+
+    bcrypt releases the GIL, so hashing on worker threads keeps the event
+    loop serving other requests; PASSWORD_HASH_WORKERS caps how many
+    hashes run at once and the rest queue for a free worker.
+    """
+
+    _executor: ThreadPoolExecutor | None = None
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=Config.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="pwd-hash",
+            )
+        return cls._executor
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.get_executor(), func, *args)
 
-    def verify_password(self, plain_password: str,
-                        hashed_password: str) -> bool:
-        return passwd_context.verify(plain_password, hashed_password)
+    async def generate_password_hash(self, password: str) -> str:
+        return await self._run(get_passwd_context().hash, password)
+
+    async def verify_password(self, plain_password: str,
+                              hashed_password: str) -> bool:
+        return await self._run(get_passwd_context().verify,
+                               plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str,
+                                hashed_password: str
+                                ) -> tuple[bool, str | None]:
+        """Verify a password and, when its hash uses a deprecated
+        scheme or cost, also return a replacement hash."""
+        return await self._run(get_passwd_context().verify_and_update,
+                               plain_password, hashed_password)
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of already verified token payloads.
+
+    Entries are keyed by the SHA-256 of the token and dropped once the
+    token's `exp` passes, so a hit is exactly as trustworthy as running
+    the signature check again.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+        # Sync dependencies such as get_token_details call in from the
+        # threadpool.
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, key: bytes) -> dict | None:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                return None
+            if payload["exp"] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: bytes, payload: dict) -> None:
+        if self.max_entries <= 0 or "exp" not in payload:
+            return
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+verified_tokens = VerifiedTokenCache(Config.JWT_CACHE_MAX_ENTRIES)
 
 
 class BearerTokenClass:
@@ -41,7 +157,7 @@ class BearerTokenClass:
 
         encoded_jwt = jwt.encode(
             payload,
-            Config.JWT_SECRET,
+            JWT_KEY,
             Config.JWT_ALGORITHM
         )
 
@@ -57,11 +173,18 @@ class BearerTokenClass:
 
     def decode_token(self, token: str, token_type: str | None = None):
         try:
-            payload = jwt.decode(
-                token,
-                Config.JWT_SECRET,
-                algorithms=[Config.JWT_ALGORITHM]
-            )
+            cache_key = verified_tokens.key(token)
+            payload = verified_tokens.get(cache_key)
+            record_cache_lookup("jwt", payload is not None)
+            if payload is None:
+                payload = jwt.decode(
+                    token,
+                    JWT_KEY,
+                    algorithms=[Config.JWT_ALGORITHM]
+                )
+                verified_tokens.set(cache_key, payload)
+            payload = dict(payload)
+
             if token_type and payload.get("type") != token_type:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -70,12 +193,12 @@ class BearerTokenClass:
 
             return payload
 
-        except ExpiredSignatureError:
+        except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has Expired"
             )
-        except JWTError:
+        except jwt.InvalidTokenError:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Invalid token"
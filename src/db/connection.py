@@ -1,25 +1,49 @@
+from typing import Optional
 
 from fastapi import FastAPI
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 
 from src.core.config import Config
+from src.db.monitoring import get_event_listeners, slow_queries
 
 
-async def init_db(app: FastAPI):
+def get_document_models() -> list:
 
-    from src.pharmacists.models import Pharmacist
+    from src.pharmacists.models import (
+        Pharmacist, ExportJob, PharmacistStat
+    )
     from src.adverts.models import Advert
     from src.news.models import News
     from src.users.models import User
     from src.quiz.models import QuizTopic, QuizQuestion
+    from src.core.conditional import ListGeneration
+
+    return [Pharmacist, ExportJob, PharmacistStat, Advert, News, User,
+            QuizTopic, QuizQuestion, ListGeneration]
+
+
+async def init_db(app: Optional[FastAPI] = None):
 
     mongo_uri = Config.MONGO_URI
-    db_client = AsyncIOMotorClient(mongo_uri)
+    db_client = AsyncIOMotorClient(
+        mongo_uri, event_listeners=get_event_listeners()
+    )
     db = db_client[Config.DB_NAME]
+    slow_queries.bind(db_client)
 
-    docs = [Pharmacist, Advert, News, User, QuizTopic, QuizQuestion]
+    docs = get_document_models()
 
     await init_beanie(database=db, document_models=docs)
 
-    app.state.mongo_client = db_client
+    from src.utils.storage import export_storage, profile_storage
+    export_storage.bind(db)
+    profile_storage.bind(db)
+
+    if Config.VERIFY_INDEXES_ON_STARTUP:
+        from src.db.indexes import log_index_report
+        await log_index_report(db, docs)
+
+    if app is not None:
+        app.state.mongo_client = db_client
+    return db_client
@@ -0,0 +1,223 @@
+"""Declared index verification.
+
+`init_beanie` creates every index declared on the document models at
+startup; this module checks what actually exists in the database and
+whether each known query shape has an index that can serve it. Shapes
+of slow queries seen at runtime are kept in the observed shapes
+collection, so the report covers them too.
+
+    python -m src.db.indexes            # report only
+    python -m src.db.indexes --create   # create declared indexes first
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from beanie.odm.utils.typing import get_index_attributes
+from pymongo import IndexModel
+
+logger = logging.getLogger("psnaks")
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    collection: str
+    fields: tuple[str, ...]
+    source: str = ""
+
+
+QUERY_SHAPES = [
+    QueryShape("news", ("slug",), "NewsService.get_news"),
+    QueryShape("news", ("created_at",), "NewsService.get_all_news"),
+    QueryShape("news", ("group", "created_at"), "NewsService.get_all_news"),
+    QueryShape("news", ("$text",), "NewsService.search_news"),
+    QueryShape("news", ("tags",), "NewsService.find_related_ids"),
+    QueryShape("news", ("related_ids",), "NewsService.recompute_related"),
+    QueryShape("pharmacists", ("pcn_license_number",),
+               "PharmacistService.get_pharmacist_by_license_number"),
+    QueryShape("pharmacists", ("technical_group",),
+               "PharmacistService.get_all_pharmacists"),
+    QueryShape("pharmacists", ("induction_year",),
+               "PharmacistService.get_all_pharmacists"),
+    QueryShape("pharmacists", ("interest_groups",),
+               "PharmacistService.get_all_pharmacists"),
+    QueryShape("pharmacists", ("place_of_work",),
+               "PharmacistService.get_all_pharmacists"),
+    QueryShape("users", ("email",), "UserService.get_existing_user_by_email"),
+    QueryShape("adverts", ("uid",), "AdvertsService.get_one_advert"),
+    QueryShape("adverts", ("active", "priority"),
+               "AdvertsService.get_all_adverts"),
+    QueryShape("quiz_topics", ("slug",), "QuizService.get_topic"),
+    QueryShape("quiz_questions", ("topic_id",), "quiz.list_questions"),
+    QueryShape("quiz_questions", ("topic_slug",), "quiz.list_questions_slug"),
+    QueryShape("export_jobs", ("status",), "ExportWorker.claim"),
+    QueryShape("pharmacist_stats", ("dimension", "value"),
+               "PharmacistStatsService.apply"),
+]
+
+# Shapes seen at runtime that are not in QUERY_SHAPES yet.
+observed_shapes: set[QueryShape] = set()
+
+OBSERVED_SHAPES_COLLECTION = "observed_query_shapes"
+
+
+async def record_shape(database, shape: QueryShape) -> None:
+    """Persist a shape observed at runtime for later index reports."""
+    try:
+        await database[OBSERVED_SHAPES_COLLECTION].update_one(
+            {"collection": shape.collection, "fields": list(shape.fields)},
+            {"$set": {"source": shape.source,
+                      "last_seen": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning("Failed to record query shape %s %s: %s",
+                       shape.collection, list(shape.fields), e)
+
+
+async def load_observed_shapes(database) -> set[QueryShape]:
+    """Shapes observed by this process and persisted by any process."""
+    shapes = set(observed_shapes)
+    async for doc in database[OBSERVED_SHAPES_COLLECTION].find():
+        shapes.add(QueryShape(doc["collection"], tuple(doc["fields"]),
+                              doc.get("source", "")))
+    return shapes
+
+
+def declared_indexes(model) -> list[IndexModel]:
+    """Indexes `init_beanie` creates for `model`, normalised to
+    IndexModel."""
+    indexes = []
+
+    for name, field in model.model_fields.items():
+        attrs = get_index_attributes(field)
+        if attrs is not None:
+            index_type, options = attrs
+            indexes.append(
+                IndexModel([(field.alias or name, index_type)], **options)
+            )
+
+    for index in getattr(model.Settings, "indexes", []):
+        if isinstance(index, IndexModel):
+            indexes.append(index)
+        elif isinstance(index, str):
+            indexes.append(IndexModel([(index, 1)]))
+        else:
+            indexes.append(IndexModel(index))
+
+    return indexes
+
+
+def _is_text(key: dict) -> bool:
+    return "text" in key.values() or "_fts" in key
+
+
+async def missing_indexes(database, models) -> dict[str, list[str]]:
+    """Declared indexes absent from (or different in) the database."""
+    report = {}
+
+    for model in models:
+        collection = model.Settings.name
+        existing = await database[collection].index_information()
+
+        problems = []
+        for index in declared_indexes(model):
+            name = index.document["name"]
+            key = dict(index.document["key"])
+            current = existing.get(name)
+
+            if current is None:
+                problems.append(f"{name} {list(key.items())} is missing")
+            elif not _is_text(key) and dict(current["key"]) != key:
+                problems.append(f"{name} has keys {current['key']}, "
+                                f"expected {list(key.items())}")
+            elif bool(current.get("unique")) != bool(
+                    index.document.get("unique")):
+                problems.append(f"{name} unique flag differs")
+
+        if problems:
+            report[collection] = problems
+
+    return report
+
+
+def _serves(key: list[tuple], shape: QueryShape) -> bool:
+    leading = key[0][0]
+    if "$text" in shape.fields:
+        return leading == "_fts"
+    return leading in shape.fields
+
+
+async def uncovered_shapes(database, shapes) -> list[QueryShape]:
+    """Query shapes whose collection has no index led by one of their
+    fields."""
+    index_info = {}
+    uncovered = []
+
+    for shape in shapes:
+        if shape.collection not in index_info:
+            index_info[shape.collection] = list(
+                (await database[shape.collection].index_information())
+                .values()
+            )
+        if not any(_serves(info["key"], shape)
+                   for info in index_info[shape.collection]):
+            uncovered.append(shape)
+
+    return uncovered
+
+
+async def log_index_report(database, models) -> bool:
+    """Log index problems; returns True when everything is in place."""
+    missing = await missing_indexes(database, models)
+    for collection, problems in missing.items():
+        for problem in problems:
+            logger.warning("Index %s.%s", collection, problem)
+
+    known = {(s.collection, s.fields) for s in QUERY_SHAPES}
+    observed = {(s.collection, s.fields): s
+                for s in await load_observed_shapes(database)
+                if (s.collection, s.fields) not in known}
+    shapes = QUERY_SHAPES + [observed[key] for key in sorted(observed)]
+    uncovered = await uncovered_shapes(database, shapes)
+    for shape in uncovered:
+        logger.warning("No index serves %s %s (%s)", shape.collection,
+                       list(shape.fields), shape.source or "observed")
+
+    return not missing and not uncovered
+
+
+async def main(create: bool) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    from src.core.config import Config
+    from src.db.connection import get_document_models, init_db
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if create:
+        client = await init_db()
+    else:
+        client = AsyncIOMotorClient(Config.MONGO_URI)
+
+    try:
+        ok = await log_index_report(client[Config.DB_NAME],
+                                    get_document_models())
+    finally:
+        client.close()
+
+    if ok:
+        logger.info("All declared indexes and query shapes are covered")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Verify (and optionally create) MongoDB indexes.")
+    parser.add_argument("--create", action="store_true",
+                        help="Create declared indexes before verifying")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.create)))
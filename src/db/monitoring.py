@@ -0,0 +1,273 @@
+"""pymongo command monitoring.
+
+Both listeners are registered on the client in `init_db`.
+
+`CommandMetricsListener` feeds the global command metrics and adds each
+command to the stats of the request that issued it; `MetricsMiddleware`
+opens those stats with `track_request` and reads them back once the
+response is sent. Motor runs driver calls with a copy of the caller's
+context, so the request's stats are visible from the listener.
+
+`SlowQueryListener` logs reads and writes slower than SLOW_QUERY_MS by
+collection and filter shape (values replaced by "?"), records the shape
+in `observed_shapes` (and once per process in the observed shapes
+collection, so `python -m src.db.indexes` reports it later) and, with
+SLOW_QUERY_EXPLAIN, explains each new slow shape once and flags
+collection scans. A slow `getMore` is reported with the filter of the
+find or aggregate that opened its cursor.
+"""
+import asyncio
+import json
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Optional
+
+from pymongo import monitoring
+
+from src.core.config import Config
+from src.core.metrics import mongo_command_duration, mongo_commands
+from src.db.indexes import QueryShape, observed_shapes, record_shape
+
+logger = logging.getLogger("psnaks")
+
+
+class RequestDbStats:
+    __slots__ = ("commands", "seconds")
+
+    def __init__(self):
+        self.commands = 0
+        self.seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestDbStats]] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def current_request_stats() -> Optional[RequestDbStats]:
+    return _request_stats.get()
+
+
+def track_request() -> RequestDbStats:
+    stats = RequestDbStats()
+    _request_stats.set(stats)
+    return stats
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def _record(self, event, outcome: str) -> None:
+        seconds = event.duration_micros / 1_000_000
+        mongo_commands.inc(command=event.command_name, outcome=outcome)
+        mongo_command_duration.observe(seconds, command=event.command_name)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.commands += 1
+            stats.seconds += seconds
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._record(event, "succeeded")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._record(event, "failed")
+
+
+# Commands whose filter is worth a shape, and where it lives.
+QUERY_COMMANDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "aggregate": "pipeline",
+    "update": "updates",
+    "delete": "deletes",
+    "getMore": None,
+}
+
+# Commands that can leave a cursor open for later getMore batches.
+CURSOR_COMMANDS = {"find", "aggregate"}
+
+
+def _command_filter(command_name: str, command) -> dict:
+    value = command.get(QUERY_COMMANDS[command_name])
+    if command_name == "aggregate":
+        # Only a leading $match can use an index.
+        stage = value[0] if value else {}
+        return dict(stage.get("$match", {}))
+    if command_name in ("update", "delete"):
+        return dict(value[0].get("q", {})) if value else {}
+    return dict(value or {})
+
+
+def filter_shape(value):
+    """`value` with every literal replaced by "?", keeping operators."""
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [filter_shape(item) for item in value]
+        return "?"
+    return "?"
+
+
+def shape_fields(query: dict) -> tuple[str, ...]:
+    """Field names a filter constrains, in the form QueryShape uses."""
+    fields = []
+    for key, value in query.items():
+        if key in ("$and", "$or", "$nor"):
+            for clause in value:
+                fields.extend(shape_fields(clause))
+        elif key == "$text":
+            fields.append(key)
+        elif not key.startswith("$"):
+            fields.append(key)
+    return tuple(dict.fromkeys(fields))
+
+
+def _is_collscan(plan) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_is_collscan(item) for item in plan.values())
+    if isinstance(plan, list):
+        return any(_is_collscan(item) for item in plan)
+    return False
+
+
+class SlowQueryListener(monitoring.CommandListener):
+
+    # Each slow shape is explained once; cap how many are remembered.
+    MAX_EXPLAINED = 1000
+    # Filters of open cursors, for their getMore batches.
+    MAX_CURSORS = 1000
+
+    def __init__(self):
+        self.client = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: dict[tuple, tuple] = {}
+        self._cursors: dict[int, tuple] = {}
+        self._explained: set[tuple] = set()
+        self._lock = threading.Lock()
+
+    def bind(self, client) -> None:
+        """Give the listener a client (and loop) to run explains on."""
+        self.client = client
+        self.loop = asyncio.get_running_loop()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name not in QUERY_COMMANDS:
+            return
+        key = (event.connection_id, event.request_id)
+
+        if event.command_name == "getMore":
+            cursor_id = event.command.get("getMore")
+            database, collection, query = self._cursors.get(cursor_id, (
+                event.database_name, event.command.get("collection"), {}
+            ))
+            self._pending[key] = (database, collection, query, cursor_id)
+            return
+
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            return
+        query = _command_filter(event.command_name, event.command)
+        self._pending[key] = (event.database_name, collection, query, None)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pending = self._finish(event)
+        if pending is None:
+            return
+
+        database, collection, query, cursor_id = pending
+        next_id = event.reply.get("cursor", {}).get("id", 0)
+        with self._lock:
+            if event.command_name == "getMore":
+                if not next_id:
+                    self._cursors.pop(cursor_id, None)
+            elif event.command_name in CURSOR_COMMANDS and next_id:
+                if len(self._cursors) >= self.MAX_CURSORS:
+                    self._cursors.pop(next(iter(self._cursors)))
+                self._cursors[next_id] = (database, collection, query)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event)
+
+    def _finish(self, event) -> Optional[tuple]:
+        pending = self._pending.pop(
+            (event.connection_id, event.request_id), None
+        )
+        duration_ms = event.duration_micros / 1000
+        if pending is None or duration_ms < Config.SLOW_QUERY_MS:
+            return pending
+
+        database, collection, query, _ = pending
+        shape = json.dumps(filter_shape(query), sort_keys=True)
+        logger.warning("Slow query %s %s.%s %.1fms shape=%s",
+                       event.command_name, database, collection,
+                       duration_ms, shape)
+
+        fields = shape_fields(query)
+        if fields:
+            self._observe(database, QueryShape(collection, fields,
+                                               "slow query"))
+
+        if Config.SLOW_QUERY_EXPLAIN and (
+                query or event.command_name != "getMore"):
+            self._schedule_explain(database, collection, query, shape)
+        return pending
+
+    def _observe(self, database: str, shape: QueryShape) -> None:
+        with self._lock:
+            if shape in observed_shapes:
+                return
+            observed_shapes.add(shape)
+        if self.client is not None and self.loop is not None:
+            asyncio.run_coroutine_threadsafe(
+                record_shape(self.client[database], shape), self.loop
+            )
+
+    def _schedule_explain(self, database: str, collection: str,
+                          query: dict, shape: str) -> None:
+        if self.client is None or self.loop is None:
+            return
+        key = (database, collection, shape)
+        with self._lock:
+            if (key in self._explained
+                    or len(self._explained) >= self.MAX_EXPLAINED):
+                return
+            self._explained.add(key)
+        asyncio.run_coroutine_threadsafe(
+            self.explain(database, collection, query, shape), self.loop
+        )
+
+    async def explain(self, database: str, collection: str, query: dict,
+                      shape: str) -> Optional[bool]:
+        """Explain `query` and warn if it is answered by a COLLSCAN."""
+        try:
+            result = await self.client[database].command({
+                "explain": {"find": collection, "filter": query},
+                "verbosity": "queryPlanner",
+            })
+        except Exception as e:
+            logger.warning("Explain failed for %s.%s: %s",
+                           collection, shape, e)
+            return None
+
+        collscan = _is_collscan(result.get("queryPlanner", {}))
+        if collscan:
+            logger.warning("COLLSCAN on %s.%s shape=%s",
+                           database, collection, shape)
+        return collscan
+
+
+command_metrics = CommandMetricsListener()
+slow_queries = SlowQueryListener()
+
+
+def get_event_listeners() -> list:
+    return [command_metrics, slow_queries]
@@ -1,15 +1,182 @@
-import redis.asyncio as aioredis
+import asyncio
+import functools
+import json
+import logging
+import time
+
 from src.core.config import Config
 
-JTI_EXPIRY = 3600
+logger = logging.getLogger("psnaks")
+
+
+@functools.cache
+def get_redis_client():
+    """The shared Redis client, created (and redis imported) on first
+    use rather than when the app module loads."""
+    import redis.asyncio as aioredis
+
+    return aioredis.from_url(Config.REDIS_URL)
+
+
+class TokenBlocklist:
+    """Revoked token ids (`jti`), checked without a network hop.
+
+    Redis holds one `blocklist:<jti>` key per revoked token, expiring
+    with the token itself, and every revocation is also published on
+    `blocklist:revoked`. Each process keeps the live entries in a local
+    dict fed by that channel and re-reads the keys when its first token
+    check starts it, after a dropped subscription and every
+    BLOCKLIST_RESYNC_SECONDS, so `is_revoked` is a dict lookup.
+
+    The dict is only trusted while subscribed and synced within the last
+    BLOCKLIST_RESYNC_SECONDS (a frozen Lambda container misses both);
+    otherwise each check reads the token's key from Redis, and a token
+    is rejected when Redis cannot be reached either.
+    """
+
+    KEY_PREFIX = "blocklist:"
+    CHANNEL = "blocklist:revoked"
+
+    def __init__(self, client=None):
+        self._client = client
+        self._revoked: dict[str, float] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._subscribed = asyncio.Event()
+        self._synced_at = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_redis_client()
+        return self._client
+
+    def _is_current(self) -> bool:
+        return (self._subscribed.is_set() and time.time() - self._synced_at
+                < Config.BLOCKLIST_RESYNC_SECONDS)
+
+    def _is_revoked_locally(self, jti: str) -> bool:
+        expires_at = self._revoked.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            self._revoked.pop(jti, None)
+            return False
+        return True
+
+    def _running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    async def is_revoked(self, jti: str) -> bool:
+        if not self._running():
+            # Started by the first token check rather than at startup, so
+            # requests that never authenticate do not pay for Redis.
+            await self.start()
+        if self._is_revoked_locally(jti):
+            return True
+        if self._is_current():
+            return False
+
+        from redis.exceptions import RedisError
+
+        try:
+            return bool(await self.client.exists(f"{self.KEY_PREFIX}{jti}"))
+        except RedisError as e:
+            logger.warning("Token blocklist unavailable, rejecting token: "
+                           "%s", e)
+            return True
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoke `jti` everywhere; raises RedisError when Redis could
+        not record it, since other processes would still accept it."""
+        ttl = int(expires_at - time.time()) + 1
+        if ttl <= 0:
+            return
+
+        self._revoked[jti] = expires_at
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(f"{self.KEY_PREFIX}{jti}", "", ex=ttl)
+            pipe.publish(self.CHANNEL, json.dumps(
+                {"jti": jti, "exp": expires_at}
+            ))
+            await pipe.execute()
+
+    async def sync(self) -> None:
+        """Reload every revoked token id from Redis."""
+        keys = [key async for key in self.client.scan_iter(
+            match=f"{self.KEY_PREFIX}*", count=500)]
+
+        ttls = []
+        if keys:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.ttl(key)
+                ttls = await pipe.execute()
+
+        now = time.time()
+        revoked = {jti: exp for jti, exp in self._revoked.items()
+                   if exp > now}
+        for key, ttl in zip(keys, ttls):
+            if ttl > 0:
+                jti = key.decode()[len(self.KEY_PREFIX):]
+                revoked[jti] = max(revoked.get(jti, 0), now + ttl)
+        self._revoked = revoked
+        self._synced_at = now
+
+    async def _listen(self) -> None:
+        from redis.exceptions import RedisError
+
+        backoff = 1
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.CHANNEL)
+                # Anything published while we were not subscribed.
+                await self.sync()
+                self._subscribed.set()
+                backoff = 1
+                async for message in pubsub.listen():
+                    entry = json.loads(message["data"])
+                    self._revoked[entry["jti"]] = float(entry["exp"])
+            except (RedisError, OSError, ValueError) as e:
+                logger.warning("Token blocklist subscription lost: %s", e)
+            finally:
+                self._subscribed.clear()
+                await pubsub.aclose()
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+    async def _resync_periodically(self) -> None:
+        from redis.exceptions import RedisError
 
-token_blocklist = aioredis.from_url(Config.REDIS_URL)
+        while True:
+            await asyncio.sleep(Config.BLOCKLIST_RESYNC_SECONDS)
+            try:
+                await self.sync()
+            except RedisError as e:
+                logger.warning("Token blocklist resync failed: %s", e)
 
+    async def start(self) -> None:
+        """Follow revocations, waiting up to BLOCKLIST_SYNC_TIMEOUT_SECONDS
+        for the first sync; until it lands, checks go to Redis."""
+        if not self._running():
+            self._tasks = [
+                asyncio.create_task(self._listen()),
+                asyncio.create_task(self._resync_periodically()),
+            ]
+        try:
+            await asyncio.wait_for(self._subscribed.wait(),
+                                   Config.BLOCKLIST_SYNC_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Token blocklist not synced yet; checking "
+                           "tokens against Redis")
 
-async def add_jti_to_blocklist(jti: str) -> None:
-    await token_blocklist.set(name=jti, value="", ex=JTI_EXPIRY)
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._subscribed.clear()
 
 
-async def token_in_blocklist(jti: str) -> bool:
-    jti = await token_blocklist.get(jti)
-    return jti is not None
+token_blocklist = TokenBlocklist()
@@ -4,6 +4,8 @@ from mangum import Mangum
 
 
 from src.db.connection import init_db
+from src.core.metrics import metrics_router
+from src.middlewares.profiling import profiling_router
 
 from src.middlewares import register_middleware
 # from src.middlewares.rate_limit import apply_rate_limit_to_router
@@ -20,6 +22,9 @@ from src.quiz.routes import quiz_router
 async def life_span(app: FastAPI):
     print("Server is starting...")
     client = await init_db(app)
+    # The token blocklist starts on the first token check, and is not
+    # stopped here: Mangum runs the lifespan around every invocation,
+    # and the subscription should outlive each one.
     try:
         yield
     finally:
@@ -81,6 +86,8 @@ def create_app() -> FastAPI:
 
     register_middleware(app)
     register_routers(app)
+    app.include_router(metrics_router, prefix=base_prefix)
+    app.include_router(profiling_router, prefix=base_prefix)
 
     return app
 
@@ -1,5 +1,7 @@
 from fastapi import FastAPI
 from src.middlewares.logging import set_up_logging
+from src.middlewares.metrics import set_up_metrics
+from src.middlewares.profiling import set_up_profiling
 from src.middlewares.rate_limit import set_up_limiter
 from src.middlewares.cors import set_up_cors
 
@@ -7,4 +9,8 @@ from src.middlewares.cors import set_up_cors
 def register_middleware(app: FastAPI):
     set_up_cors(app)
     set_up_limiter(app)
+    # Inside the metrics middleware, so it can read the request's
+    # MongoDB stats.
+    set_up_profiling(app)
+    set_up_metrics(app)
     set_up_logging(app)
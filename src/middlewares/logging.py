@@ -1,19 +1,112 @@
+import atexit
+import json
 import logging
-from fastapi import FastAPI, Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import queue
+import random
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from fastapi import FastAPI
+
+from src.core.config import Config
 
 logger = logging.getLogger("psnaks")
-logging.basicConfig(level=logging.INFO,
-                    format="%(asctime)s - %(levelname)s - %(message)s")
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+access_logger = logging.getLogger("psnaks.access")
+
+
+def _configure_access_logger() -> QueueListener:
+    """Route access records through a queue drained by a worker thread.
+
+    Request handlers only enqueue the record; formatting and the write
+    to stderr happen on the listener's thread.
+    """
+    records = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(message)s"))
+
+    access_logger.handlers = [QueueHandler(records)]
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+
+    listener = QueueListener(records, stream, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+class AccessLogMiddleware:
+    """One JSON access record per HTTP request.
+
+    Pure ASGI, so the response body is passed through untouched and
+    streaming responses keep streaming. Successful requests are sampled
+    at ACCESS_LOG_SAMPLE_RATE; server errors and requests slower than
+    ACCESS_LOG_SLOW_MS are always logged.
+    """
+
+    def __init__(self, app, sample_rate: float = 1.0,
+                 slow_ms: float = 1000):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        response = {"status": 500, "bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if self._should_log(response["status"], duration_ms):
+                access_logger.info(json.dumps(
+                    self._record(scope, response, duration_ms)
+                ))
 
+    def _should_log(self, status_code: int, duration_ms: float) -> bool:
+        if status_code >= 500 or duration_ms >= self.slow_ms:
+            return True
+        return random.random() < self.sample_rate
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logger.info(f"Incoming request: {request.method} {request.url}")
-        response = await call_next(request)
-        logger.info(f"Response status: {response.status_code}")
-        return response
+    @staticmethod
+    def _record(scope, response: dict, duration_ms: float) -> dict:
+        route = scope.get("route")
+        state = scope.get("state") or {}
+        client = scope.get("client")
+        return {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "method": scope["method"],
+            # The template keeps ids out of the path, so records group
+            # by endpoint; fall back to the raw path for 404s.
+            "route": getattr(route, "path", None) or scope["path"],
+            "status": response["status"],
+            "duration_ms": round(duration_ms, 2),
+            "bytes": response["bytes"],
+            "user_id": state.get("user_id"),
+            "client": client[0] if client else None,
+        }
 
 
 def set_up_logging(app: FastAPI):
-    app.add_middleware(LoggingMiddleware)
+    _configure_access_logger()
+    app.add_middleware(
+        AccessLogMiddleware,
+        sample_rate=Config.ACCESS_LOG_SAMPLE_RATE,
+        slow_ms=Config.ACCESS_LOG_SLOW_MS,
+    )
@@ -0,0 +1,64 @@
+import time
+
+from fastapi import FastAPI
+
+from src.core.config import Config
+from src.core.metrics import (
+    emit_emf_request, http_request_duration, http_requests,
+    http_requests_in_flight, mongo_commands_per_request,
+    mongo_time_per_request
+)
+from src.db.monitoring import track_request
+
+# Requests that matched no route share one label value instead of one
+# series per probed path.
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """Per-route request counts, latency and MongoDB usage.
+
+    Pure ASGI so streaming responses are timed until their last chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        db_stats = track_request()
+        response = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+
+            elapsed = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            http_requests.inc(method=method, route=route,
+                              status=response["status"])
+            http_request_duration.observe(elapsed, method=method,
+                                          route=route)
+            mongo_commands_per_request.observe(db_stats.commands,
+                                               route=route)
+            mongo_time_per_request.observe(db_stats.seconds, route=route)
+            if Config.METRICS_EMF_NAMESPACE:
+                emit_emf_request(method, route, response["status"],
+                                 elapsed, db_stats.commands,
+                                 db_stats.seconds)
+
+
+def set_up_metrics(app: FastAPI):
+    app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,206 @@
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import re
+import time
+import uuid
+
+from fastapi import (
+    APIRouter, Depends, FastAPI, HTTPException, Query, Request, status
+)
+from pymongo.errors import PyMongoError
+
+from src.core.config import Config
+from src.core.dependencies import (
+    bearer_scheme, get_current_user, get_token_details, require_admin
+)
+from src.db.monitoring import current_request_stats
+from src.utils.storage import profile_storage
+
+logger = logging.getLogger("psnaks")
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_TOP_FUNCTIONS = 40
+
+PROFILE_ID_RE = re.compile(r"[0-9a-f]{32}")
+PROFILE_FORMATS = {
+    "txt": "text/plain; charset=utf-8",
+    "prof": "application/octet-stream",
+}
+
+
+class ProfilingMiddleware:
+    """Profile a single request with cProfile, on an admin's demand.
+
+    A request from an admin carrying `X-Profile: <mode>` (or
+    `?profile=<mode>`) runs under the profiler:
+    - `return` (or `1`) replaces the response body with the profile
+      summary; the handler's own status is in `X-Profile-Status`.
+    - `store` sends the response as usual and stores `<id>.prof`
+      (pstats) and `<id>.txt` in profile storage, with the id in
+      `X-Profile-Id`; admins fetch them from `GET /profiles/<id>`.
+    Anyone else gets the normal response, unprofiled.
+
+    cProfile sees everything on the event loop thread while it runs, so
+    concurrent requests show up in the profile too, and run slower for
+    its duration; only one request is profiled at a time. Work on other
+    threads (sync routes, the Motor executor) is not sampled: awaiting
+    it shows up as loop wait, and the summary adds the request's
+    MongoDB command count and time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = self._requested_mode(scope)
+        if mode is None or self._lock.locked() \
+                or not await self._is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+
+        async with self._lock:
+            if mode == "store":
+                await self._profile_and_store(scope, receive, send)
+            else:
+                await self._profile_and_return(scope, receive, send)
+
+    @staticmethod
+    def _requested_mode(scope):
+        request = Request(scope)
+        mode = (request.headers.get(PROFILE_HEADER.decode())
+                or request.query_params.get(PROFILE_QUERY_PARAM))
+        if not mode or mode in ("0", "false"):
+            return None
+        return "store" if mode == "store" else "return"
+
+    @staticmethod
+    async def _is_admin(scope) -> bool:
+        request = Request(scope)
+        try:
+            credentials = await bearer_scheme(request)
+            token_details = get_token_details(request, credentials)
+            principal = await get_current_user(request, token_details)
+        except HTTPException:
+            return False
+        return principal.is_admin
+
+    async def _run_profiled(self, scope, receive, send):
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+        return profiler, time.perf_counter() - started
+
+    async def _profile_and_return(self, scope, receive, send):
+        response = {"status": 500}
+
+        async def discard_response(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+
+        profiler, elapsed = await self._run_profiled(
+            scope, receive, discard_response
+        )
+        body = self._summary(scope, profiler, elapsed).encode("utf-8")
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profile-status", str(response["status"]).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _profile_and_store(self, scope, receive, send):
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        profiler, elapsed = await self._run_profiled(
+            scope, receive, send_with_id
+        )
+        summary = self._summary(scope, profiler, elapsed)
+        try:
+            paths = await asyncio.to_thread(self._write, profile_id,
+                                            profiler, summary)
+            for key, path in paths.items():
+                await profile_storage.save(key, path)
+        except (OSError, PyMongoError) as e:
+            logger.warning("Failed to store profile %s: %s", profile_id, e)
+            return
+        logger.info("Stored profile %s for %s %s (%.1fms)", profile_id,
+                    scope["method"], scope["path"], elapsed * 1000)
+
+    @staticmethod
+    def _write(profile_id: str, profiler: cProfile.Profile,
+               summary: str) -> dict[str, str]:
+        keys = [f"{profile_id}.{ext}" for ext in PROFILE_FORMATS]
+        paths = {key: profile_storage.prepare(key) for key in keys}
+        profiler.dump_stats(paths[f"{profile_id}.prof"])
+        with open(paths[f"{profile_id}.txt"], "w") as f:
+            f.write(summary)
+        return paths
+
+    @staticmethod
+    def _summary(scope, profiler: cProfile.Profile, elapsed: float) -> str:
+        out = io.StringIO()
+        out.write(f"{scope['method']} {scope['path']} "
+                  f"{elapsed * 1000:.1f}ms wall\n")
+
+        db_stats = current_request_stats()
+        if db_stats is not None:
+            out.write(f"MongoDB: {db_stats.commands} commands, "
+                      f"{db_stats.seconds * 1000:.1f}ms\n")
+        out.write("\n")
+
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        stats.print_stats(PROFILE_TOP_FUNCTIONS)
+        return out.getvalue()
+
+
+profiling_router = APIRouter()
+
+
+@profiling_router.get("/profiles/{profile_id}", include_in_schema=False,
+                      dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str,
+                      format: str = Query("txt", pattern="^(txt|prof)$")):
+    response = None
+    if PROFILE_ID_RE.fullmatch(profile_id):
+        response = await profile_storage.response(
+            f"{profile_id}.{format}",
+            media_type=PROFILE_FORMATS[format],
+            filename=f"{profile_id}.{format}",
+        )
+    if response is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return response
+
+
+def set_up_profiling(app: FastAPI):
+    if Config.PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware)
@@ -0,0 +1,30 @@
+"""One-off backfill of the materialized related-article lists.
+
+Articles written before `related_ids` existed have it unset and get
+their list computed on first read; this fills them all in at once.
+
+    python -m src.news.backfill
+"""
+import asyncio
+import logging
+
+logger = logging.getLogger("psnaks")
+
+
+async def main() -> None:
+    from src.db.connection import init_db
+    from src.news.services import news_svc
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    client = await init_db()
+    try:
+        count = await news_svc.backfill_related()
+    finally:
+        client.close()
+
+    logger.info("Backfilled related articles for %d news articles", count)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
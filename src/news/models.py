@@ -1,8 +1,9 @@
 from typing import Optional, Annotated, List
-from beanie import Document, Indexed, before_event
+from beanie import Document, Indexed, PydanticObjectId, before_event
 from beanie.odm.actions import Update
 from datetime import datetime, timezone
 from pydantic import Field
+from pymongo import IndexModel, DESCENDING, TEXT
 
 
 class News(Document):
@@ -11,8 +12,9 @@ class News(Document):
     content: Optional[str] = None
     author: str = Field(index=True, min_length=2, max_length=100)
     image_url: str = Field(index=True, min_length=2, max_length=500)
-    slug: str = Annotated[str, Indexed(unique=True)]
+    slug: Annotated[str, Indexed(unique=True)]
     tags: List[str] = Field(default_factory=list)
+    related_ids: Optional[List[PydanticObjectId]] = None
     group: Optional[str] = Field(default="general",
                                  min_length=2, max_length=50)
     created_at: datetime = Field(
@@ -33,4 +35,24 @@ class News(Document):
             "author",
             "image_url",
             "group",
+            IndexModel(
+                [("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="created_at_id_desc",
+            ),
+            IndexModel(
+                [("group", 1), ("created_at", DESCENDING),
+                 ("_id", DESCENDING)],
+                name="group_created_at_id_desc",
+            ),
+            IndexModel(
+                [("tags", 1), ("created_at", DESCENDING)],
+                name="tags_created_at_desc",
+            ),
+            IndexModel([("related_ids", 1)], name="related_ids"),
+            IndexModel(
+                [("title", TEXT), ("author", TEXT), ("content", TEXT)],
+                weights={"title": 10, "author": 5, "content": 1},
+                default_language="english",
+                name="news_text_search",
+            ),
         ]
@@ -1,27 +1,65 @@
 from typing import Optional
-from fastapi import APIRouter, Request, status, UploadFile, File, Form, Query
+from fastapi import (
+    APIRouter, Request, Response, status, UploadFile, File, Form, Query,
+    Depends
+)
 
-from src.news.schemas import NewsDetailResponse, NewsRead
+from src.news.schemas import (
+    NewsDetailResponse, NewsRead, NewsSearchResult
+)
 
 # from src.core.dependencies import (
 #     RoleChecker, get_current_user, get_token_details
 # )
 
+from src.core.cache import response_cache
+from src.core.conditional import ConditionalGet
+from src.core.responses import raw_json_response
 from src.news.services import news_svc
 
 news_router = APIRouter()
+
+news_list_conditional = ConditionalGet(
+    lambda request: news_svc.get_news_list_version()
+)
+news_detail_conditional = ConditionalGet(
+    lambda request: news_svc.get_news_version(request.path_params["slug"])
+)
 # role_checker = RoleChecker(["admin", "customer"])
 # admin_role = RoleChecker(["admin"])
 
 
-@news_router.get("", status_code=status.HTTP_200_OK)
+@news_router.get("", status_code=status.HTTP_200_OK,
+                 dependencies=[Depends(news_list_conditional)])
+@response_cache.cached("news")
 async def list_news(
     request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     limit: int = Query(5, ge=1, le=50),
     q: Optional[str] = Query(default=None),
     group: Optional[str] = Query(default=None),
+    cursor: Optional[str] = Query(
+        default=None,
+        description=("Continuation token for keyset pagination. Pass an "
+                     "empty value to start from the newest article; "
+                     "`page` is ignored in this mode.")
+    ),
 ):
+    if cursor is not None:
+        items, next_cursor = await news_svc.get_news_after_cursor(
+            limit=limit,
+            cursor=cursor,
+            q=q,
+            group=group,
+        )
+
+        return raw_json_response({
+            "items": items,
+            "next_cursor": next_cursor,
+            "limit": limit,
+        }, response)
+
     items, total = await news_svc.get_all_news(
         page=page,
         limit=limit,
@@ -29,12 +67,35 @@ async def list_news(
         group=group,
     )
 
-    return {
+    return raw_json_response({
         "items": items,
         "total": total,
         "page": page,
         "limit": limit,
-    }
+    }, response)
+
+
+@news_router.get("/search", response_model=list[NewsSearchResult],
+                 status_code=status.HTTP_200_OK,
+                 dependencies=[Depends(news_list_conditional)])
+@response_cache.cached("news")
+async def search_news(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    group: Optional[str] = Query(default=None),
+    phrase: bool = Query(
+        False, description="Match `q` as an exact phrase"
+    ),
+):
+    results = await news_svc.search_news(
+        q=q,
+        limit=limit,
+        group=group,
+        phrase=phrase,
+    )
+    return raw_json_response(results, response)
 
 
 @news_router.post("", response_model=NewsRead,
@@ -78,7 +139,9 @@ async def add_news(request: Request,
 
 
 @news_router.get("/slug/{slug}", response_model=NewsDetailResponse,
-                 status_code=status.HTTP_200_OK)
+                 status_code=status.HTTP_200_OK,
+                 dependencies=[Depends(news_detail_conditional)])
+@response_cache.cached("news")
 async def get_news_by_slug(request: Request,
                            slug: str):
     news = await news_svc.get_a_news_by_slug(slug)
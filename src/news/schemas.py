@@ -1,8 +1,11 @@
 from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, Field, ConfigDict
+from beanie import PydanticObjectId
 from bson import ObjectId
 
+from src.core.conditional import VersionProjection
+
 
 class NewsBase(BaseModel):
     title: str
@@ -54,6 +57,14 @@ class NewsRead(NewsBase):
         return cls(**data)
 
 
+class NewsVersionProjection(VersionProjection):
+    related_ids: Optional[list[PydanticObjectId]] = None
+
+
+class NewsSearchResult(NewsRead):
+    score: float
+
+
 class NewsDetailResponse(BaseModel):
     article: NewsRead
     related: list[NewsRead] = []
@@ -1,13 +1,33 @@
+import asyncio
 from typing import Optional, List, Tuple
+from bson import ObjectId
 from datetime import datetime, timezone
 from fastapi import HTTPException, UploadFile, status
 from fastapi.responses import JSONResponse
-
+from pymongo import UpdateOne
+from pymongo.errors import ExecutionTimeout
+
+from src.core.cache import response_cache
+from src.core.conditional import (
+    ResourceVersion, document_version, list_versions
+)
+from src.core.config import Config
+from src.core.responses import mongo_projection
 from src.news.models import News
-from src.news.schemas import NewsRead
+from src.news.schemas import (
+    NewsRead, NewsSearchResult, NewsVersionProjection
+)
 from src.utils.cloudinary import upload_to_cloudinary
+from src.utils.cursor import encode_cursor, decode_cursor
 from src.utils.slugify import generate_slug_from_title
 
+RELATED_NEWS_LIMIT = 3
+
+NEWS_PROJECTION = mongo_projection(NewsRead)
+NEWS_SEARCH_PROJECTION = mongo_projection(
+    NewsSearchResult, score={"$meta": "textScore"}
+)
+
 
 class NewsService:
 
@@ -24,15 +44,11 @@ class NewsService:
         news = await self.get_news(slug)
         return await NewsRead.from_mongo(news)
 
-    async def get_all_news(
+    def build_filters(
         self,
-        page: int = 1,
-        limit: int = 5,
         q: Optional[str] = None,
         group: Optional[str] = None,
-    ) -> Tuple[list[NewsRead], int]:
-
-        skip = (page - 1) * limit
+    ) -> dict:
 
         filters = {}
 
@@ -43,21 +59,136 @@ class NewsService:
                 filters["group"] = {"$in": group_list}
 
         if q:
-            filters["$or"] = [
-                {"title": {"$regex": q, "$options": "i"}},
-                {"content": {"$regex": q, "$options": "i"}},
-                {"author": {"$regex": q, "$options": "i"}},
-            ]
+            filters["$text"] = {"$search": q}
+
+        return filters
+
+    async def get_news_version(self,
+                               slug: str) -> Optional[ResourceVersion]:
+        return await document_version(
+            News, News.slug == slug,
+            projection_model=NewsVersionProjection
+        )
+
+    async def get_news_list_version(self) -> ResourceVersion:
+        # Any write moves every listing; ETags are scoped to the URL, so
+        # the filters need not be part of it.
+        return await list_versions.version("news")
+
+    async def get_all_news(
+        self,
+        page: int = 1,
+        limit: int = 5,
+        q: Optional[str] = None,
+        group: Optional[str] = None,
+    ) -> Tuple[list[dict], int]:
+
+        skip = (page - 1) * limit
 
-        query = News.find(filters).sort(-News.created_at)
+        filters = self.build_filters(q, group)
+        page_stages = [
+            {"$skip": skip},
+            {"$limit": limit},
+            {"$project": NEWS_PROJECTION},
+        ]
+        sort = {"$sort": {"created_at": -1, "_id": -1}}
+
+        if not filters:
+            # The unfiltered total comes from collection metadata instead
+            # of counting every article through the pipeline.
+            items, total = await asyncio.gather(
+                News.aggregate([sort, *page_stages]).to_list(),
+                News.get_pymongo_collection().estimated_document_count(),
+            )
+            return items, total
+
+        pipeline = [
+            {"$match": filters},
+            sort,
+            {"$facet": {
+                "items": page_stages,
+                "total": [{"$count": "count"}],
+            }},
+        ]
 
-        total = await query.count()
+        [page_data] = await News.aggregate(pipeline).to_list()
 
-        results = await query.skip(skip).limit(limit).to_list()
+        total = page_data["total"][0]["count"] if page_data["total"] else 0
 
-        items = [await NewsRead.from_mongo(n) for n in results]
+        return page_data["items"], total
 
-        return items, total
+    async def get_news_after_cursor(
+        self,
+        limit: int = 5,
+        cursor: Optional[str] = None,
+        q: Optional[str] = None,
+        group: Optional[str] = None,
+    ) -> Tuple[list[dict], Optional[str]]:
+
+        filters = self.build_filters(q, group)
+
+        if cursor:
+            created_at, last_id = decode_cursor(cursor,
+                                                (datetime, ObjectId))
+            after = {
+                "$or": [
+                    {"created_at": {"$lt": created_at}},
+                    {"created_at": created_at, "_id": {"$lt": last_id}},
+                ]
+            }
+            filters = {"$and": [filters, after]} if filters else after
+
+        results = await News.aggregate([
+            {"$match": filters},
+            {"$sort": {"created_at": -1, "_id": -1}},
+            {"$limit": limit + 1},
+            {"$project": NEWS_PROJECTION},
+        ]).to_list()
+
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            next_cursor = encode_cursor(last["created_at"],
+                                        ObjectId(last["_id"]))
+
+        return results, next_cursor
+
+    async def search_news(
+        self,
+        q: str,
+        limit: int = 10,
+        group: Optional[str] = None,
+        phrase: bool = False,
+    ) -> list[dict]:
+
+        if phrase:
+            terms = q.replace('"', " ").strip()
+            if not terms:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail="Search phrase is empty"
+                )
+            q = f'"{terms}"'
+
+        pipeline = [
+            {"$match": self.build_filters(q, group)},
+            {"$sort": {"score": {"$meta": "textScore"}, "created_at": -1}},
+            {"$limit": limit},
+            {"$project": NEWS_SEARCH_PROJECTION},
+        ]
+
+        try:
+            results = await News.aggregate(
+                pipeline, maxTimeMS=Config.NEWS_SEARCH_MAX_TIME_MS
+            ).to_list()
+        except ExecutionTimeout:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Search took too long, please refine your query"
+            )
+
+        return results
 
     async def add_a_news(
         self,
@@ -84,9 +215,13 @@ class NewsService:
             slug=slug,
             group=group,
             image_url=image_url,
+            related_ids=[],
         )
 
         await news.insert()
+        await self.add_to_related(news)
+        await response_cache.invalidate("news")
+        await list_versions.bump("news")
         return await NewsRead.from_mongo(news)
 
     # async def update_a_news(
@@ -134,13 +269,110 @@ class NewsService:
 
         return [await NewsRead.from_mongo(n) for n in related_news]
 
+    async def find_related_ids(
+        self,
+        article_id: ObjectId,
+        tags: List[str]
+    ) -> List[ObjectId]:
+        """The newest articles sharing a tag with `article_id`, served
+        by the tags_created_at_desc index."""
+
+        if not tags:
+            return []
+
+        cursor = News.get_pymongo_collection().find(
+            {"tags": {"$in": tags}, "_id": {"$ne": article_id}},
+            {"_id": 1},
+        ).sort([("created_at", -1), ("_id", -1)]).limit(RELATED_NEWS_LIMIT)
+        return [doc["_id"] async for doc in cursor]
+
+    async def recompute_related(self, query: dict) -> int:
+        """Rewrite the related list of each article matching `query`,
+        one indexed find per article; returns how many were written."""
+
+        collection = News.get_pymongo_collection()
+        articles = await collection.find(
+            query, {"tags": 1}
+        ).to_list(None)
+        if not articles:
+            return 0
+
+        related = await asyncio.gather(*(
+            self.find_related_ids(a["_id"], a.get("tags") or [])
+            for a in articles
+        ))
+        await collection.bulk_write(
+            [UpdateOne({"_id": a["_id"]}, {"$set": {"related_ids": ids}})
+             for a, ids in zip(articles, related)],
+            ordered=False,
+        )
+        return len(articles)
+
+    async def add_to_related(self, news: News) -> None:
+        """Put a new article at the head of the related list of every
+        article sharing one of its tags, then fill in its own list.
+
+        A new article is the newest, so it always belongs first; lists
+        not materialized yet are left to the backfill.
+        """
+
+        await News.get_pymongo_collection().update_many(
+            {"tags": {"$in": news.tags}, "_id": {"$ne": news.id},
+             "related_ids": {"$ne": None}},
+            {"$push": {"related_ids": {
+                "$each": [news.id],
+                "$position": 0,
+                "$slice": RELATED_NEWS_LIMIT,
+            }}},
+        )
+        await self.recompute_related({"_id": news.id})
+
+    async def backfill_related(self) -> int:
+        """Materialize the related list of articles written before the
+        lists existed.
+
+            python -m src.news.backfill
+        """
+        return await self.recompute_related({"related_ids": None})
+
     async def get_a_news_by_slug(self, slug: str):
-        news = await self.get_news_by_slug(slug)
-        related = await self.get_related_news(news.tags, news.slug)
+        pipeline = [
+            {"$match": {"slug": slug}},
+            {"$limit": 1},
+            {"$lookup": {
+                "from": News.get_collection_name(),
+                "localField": "related_ids",
+                "foreignField": "_id",
+                "as": "related",
+            }},
+        ]
+
+        results = await News.aggregate(pipeline).to_list()
+        if not results:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="News not found"
+            )
+
+        article = results[0]
+        related_docs = article.pop("related")
+
+        if article.get("related_ids") is None:
+            # written before related lists were materialized
+            news = await NewsRead.from_mongo(article)
+            await self.recompute_related({"_id": article["_id"]})
+            return {
+                "article": news,
+                "related": await self.get_related_news(news.tags,
+                                                       news.slug),
+            }
+
+        order = {rid: i for i, rid in enumerate(article["related_ids"])}
+        related_docs.sort(key=lambda n: order[n["_id"]])
 
         return {
-            "article": news,
-            "related": related,
+            "article": await NewsRead.from_mongo(article),
+            "related": [await NewsRead.from_mongo(n) for n in related_docs],
         }
 
     async def update_a_news_by_slug(
@@ -155,6 +387,7 @@ class NewsService:
     ) -> News:
 
         news = await self.get_news(slug)
+        old_tags = list(news.tags)
 
         if title:
             news.title = title
@@ -175,6 +408,22 @@ class NewsService:
 
         news.updated_at = datetime.now(timezone.utc)
         await news.save()
+        # Articles listing this one embed its title, slug and image in
+        # their detail response, so their versions move with it.
+        await News.get_pymongo_collection().update_many(
+            {"related_ids": news.id},
+            {"$set": {"updated_at": news.updated_at}},
+        )
+        if tags is not None and set(tags) != set(old_tags):
+            # Articles listing this one may have lost the shared tag, and
+            # articles under the added tags may now list it.
+            await self.recompute_related({"$or": [
+                {"_id": news.id},
+                {"related_ids": news.id},
+                {"tags": {"$in": list(set(tags) - set(old_tags))}},
+            ]})
+        await response_cache.invalidate("news")
+        await list_versions.bump("news")
 
         return await NewsRead.from_mongo(news)
 
@@ -182,6 +431,9 @@ class NewsService:
 
         news = await self.get_news(slug)
         await news.delete()
+        await self.recompute_related({"related_ids": news.id})
+        await response_cache.invalidate("news")
+        await list_versions.bump("news")
 
         return JSONResponse(
             content="News deleted successfully",
@@ -0,0 +1,273 @@
+import ast
+import codecs
+import csv
+import json
+import os
+import zipfile
+from datetime import date, datetime, time, timezone
+from typing import Iterator, Optional
+
+from fastapi import HTTPException, UploadFile, status
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
+
+from src.core.conditional import list_versions
+from src.pharmacists.models import Pharmacist
+from src.pharmacists.search import pharmacist_search_index
+from src.pharmacists.stats import pharmacist_stats_svc
+from src.pharmacists.schemas import (
+    PharmacistCreateSchema, PharmacistImportErrorSchema,
+    PharmacistImportReportSchema
+)
+
+IMPORT_BATCH_SIZE = 1000
+
+IMPORT_MAX_ERRORS = 1000
+
+IMPORT_FORMATS = {
+    ".csv": "csv",
+    ".xlsx": "xlsx",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+# Columns kept as-is; every other value is read as text, so spreadsheet
+# cells such as phone numbers that come back as ints still validate.
+TYPED_COLUMNS = {"induction_year", "date_of_birth", "interest_groups"}
+
+
+def _csv_rows(handle) -> Iterator[dict]:
+    reader = csv.DictReader(codecs.iterdecode(handle, "utf-8-sig"))
+    yield from reader
+
+
+def _xlsx_rows(handle) -> Iterator[dict]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(handle, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else ""
+                  for cell in next(rows, [])]
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        wb.close()
+
+
+def _jsonl_rows(handle) -> Iterator[dict]:
+    for line in codecs.iterdecode(handle, "utf-8-sig"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"Invalid JSON: {e.msg}")
+
+
+ROW_READERS = {
+    "csv": _csv_rows,
+    "xlsx": _xlsx_rows,
+    "jsonl": _jsonl_rows,
+}
+
+
+def _split_groups(value) -> list[str]:
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith("["):
+            # The CSV export writes the list repr, e.g. "['a', 'b']".
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                value = value.strip("[]")
+        if isinstance(value, str):
+            value = value.split(",")
+    return [str(g).strip() for g in value if str(g).strip()]
+
+
+def normalize_row(row: dict) -> dict:
+    data = {}
+    for key, value in row.items():
+        if not key:
+            continue
+        key = key.strip()
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+
+        if key == "interest_groups":
+            value = _split_groups(value)
+        elif key == "date_of_birth" and isinstance(value, datetime):
+            value = value.date()
+        elif key not in TYPED_COLUMNS and not isinstance(value, str):
+            value = str(value)
+        data[key] = value
+    return data
+
+
+def _error_messages(exc: ValidationError) -> list[str]:
+    return [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+            for err in exc.errors()]
+
+
+def _to_document(data: PharmacistCreateSchema) -> dict:
+    doc = data.model_dump(exclude_unset=True)
+    if isinstance(doc.get("date_of_birth"), date):
+        doc["date_of_birth"] = datetime.combine(doc["date_of_birth"],
+                                                time.min)
+    return doc
+
+
+def read_batch(rows: Iterator, start: int, size: int):
+    """Parse and validate up to `size` rows. Returns the valid
+    (row number, document) pairs, the per-row errors and how many rows
+    were consumed."""
+    valid, errors = [], []
+    consumed = 0
+
+    for row in rows:
+        consumed += 1
+        row_number = start + consumed
+        license_number = None
+
+        try:
+            if isinstance(row, Exception):
+                raise row
+            data = normalize_row(row)
+            license_number = data.get("pcn_license_number")
+            pharmacist = PharmacistCreateSchema(**data)
+            # The schema leaves email and phone optional; the stored
+            # document (and its unique email index) does not.
+            Pharmacist.model_validate(
+                pharmacist.model_dump(exclude_unset=True)
+            )
+        except ValidationError as e:
+            errors.append((row_number, license_number, _error_messages(e)))
+        except (ValueError, TypeError, AttributeError) as e:
+            errors.append((row_number, license_number, [str(e)]))
+        else:
+            valid.append((row_number, _to_document(pharmacist)))
+
+        if consumed >= size:
+            break
+
+    return valid, errors, consumed
+
+
+def _record_error(report: PharmacistImportReportSchema, row: int,
+                  license_number: Optional[str], messages: list[str]):
+    report.failed += 1
+    if len(report.errors) < IMPORT_MAX_ERRORS:
+        report.errors.append(PharmacistImportErrorSchema(
+            row=row, pcn_license_number=license_number, errors=messages
+        ))
+    else:
+        report.errors_truncated = True
+
+
+class PharmacistImportService:
+
+    def detect_format(self, upload: UploadFile,
+                      format: Optional[str] = None) -> str:
+        if format:
+            return format
+
+        extension = os.path.splitext(upload.filename or "")[1].lower()
+        if extension in IMPORT_FORMATS:
+            return IMPORT_FORMATS[extension]
+
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported file type; upload .csv, .xlsx or .jsonl"
+        )
+
+    async def write_batch(self, batch: list[tuple[int, dict]], report):
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                {"pcn_license_number": doc["pcn_license_number"]},
+                {"$set": {**doc, "updated_at": now},
+                 "$setOnInsert": {"created_at": now}},
+                upsert=True,
+            )
+            for _, doc in batch
+        ]
+
+        collection = Pharmacist.get_pymongo_collection()
+        try:
+            result = await collection.bulk_write(operations, ordered=False)
+            result = result.bulk_api_result
+        except BulkWriteError as e:
+            result = e.details
+            for error in result["writeErrors"]:
+                row_number, doc = batch[error["index"]]
+                message = error.get("errmsg", "Write failed")
+                if error.get("code") == 11000:
+                    message = "Duplicate key: " + str(error.get("keyValue"))
+                _record_error(report, row_number,
+                              doc["pcn_license_number"], [message])
+
+        report.inserted += result["nUpserted"]
+        report.updated += result["nMatched"]
+
+    async def import_pharmacists(self, upload: UploadFile,
+                                 format: Optional[str] = None,
+                                 batch_size: int = IMPORT_BATCH_SIZE):
+        """Validate and upsert every row of `upload`, keyed by
+        `pcn_license_number`. Rows are parsed off the event loop a batch
+        at a time and written with unordered bulk writes, so one bad row
+        never stops the rest."""
+
+        format = self.detect_format(upload, format)
+        report = PharmacistImportReportSchema()
+
+        await upload.seek(0)
+        rows = ROW_READERS[format](upload.file)
+        seen = set()
+
+        try:
+            while True:
+                valid, errors, consumed = await run_in_threadpool(
+                    read_batch, rows, report.total_rows, batch_size
+                )
+                if not consumed:
+                    break
+                report.total_rows += consumed
+
+                for error in errors:
+                    _record_error(report, *error)
+
+                batch = []
+                for row_number, doc in valid:
+                    license_number = doc["pcn_license_number"]
+                    if license_number in seen:
+                        _record_error(
+                            report, row_number, license_number,
+                            ["pcn_license_number appears earlier in the "
+                             "file"])
+                        continue
+                    seen.add(license_number)
+                    batch.append((row_number, doc))
+
+                if batch:
+                    await self.write_batch(batch, report)
+        except (csv.Error, UnicodeDecodeError, zipfile.BadZipFile,
+                OSError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not read {format} file: {e}"
+            )
+
+        if report.inserted or report.updated:
+            await list_versions.bump("pharmacists")
+            await pharmacist_stats_svc.refresh()
+            pharmacist_search_index.schedule_rebuild()
+        return report
+
+
+pharmacist_import_svc = PharmacistImportService()
@@ -0,0 +1,227 @@
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from beanie import PydanticObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+
+from src.core.config import Config
+from src.pharmacists.models import ExportJob, Pharmacist
+from src.pharmacists.schemas import ExportJobCreateSchema, ExportJobReadSchema
+from src.pharmacists.services import pharmacist_svc, XLSX_MEDIA_TYPE
+from src.utils.storage import export_storage
+
+logger = logging.getLogger("psnaks")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": XLSX_MEDIA_TYPE,
+}
+
+
+class ExportWorker:
+    """Produces export artifacts for queued ExportJob documents.
+
+    Jobs are claimed atomically, so several workers (the API process in
+    inline mode, `python -m src.pharmacists.jobs` or the scheduled
+    `handler`) can drain the same queue without running a job twice. A
+    running job that has made no progress for EXPORT_JOB_STALE_MINUTES
+    (its worker died, or was a frozen Lambda) is claimed again.
+    """
+
+    def __init__(self):
+        self._tasks: set[asyncio.Task] = set()
+
+    def dispatch(self, job_id: PydanticObjectId) -> None:
+        if Config.EXPORT_WORKER_MODE != "inline":
+            return
+        task = asyncio.create_task(self.run(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def claim(self, job_id: Optional[PydanticObjectId] = None):
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(minutes=Config.EXPORT_JOB_STALE_MINUTES)
+        query = {"$or": [
+            {"status": "queued"},
+            {"status": "running", "updated_at": {"$lt": stale}},
+        ]}
+        if job_id is not None:
+            query["_id"] = job_id
+
+        doc = await ExportJob.get_pymongo_collection().find_one_and_update(
+            query,
+            {"$set": {"status": "running", "started_at": now,
+                      "updated_at": now, "rows_written": 0}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return ExportJob.model_validate(doc) if doc else None
+
+    async def run(self, job_id: Optional[PydanticObjectId] = None) -> bool:
+        job = await self.claim(job_id)
+        if job is None:
+            return False
+
+        key = f"pharmacists/{job.id}.{job.format}"
+        path = export_storage.prepare(key)
+
+        try:
+            total_rows = await Pharmacist.find(job.filters).count()
+            await job.set({"total_rows": total_rows})
+
+            async def progress(rows: int):
+                await job.update({
+                    "$inc": {"rows_written": rows},
+                    "$set": {"updated_at": datetime.now(timezone.utc)},
+                })
+
+            if job.format == "xlsx":
+                await pharmacist_svc.write_pharmacists_excel(
+                    path, job.filters, progress)
+            else:
+                await pharmacist_svc.write_pharmacists_csv(
+                    path, job.filters, progress)
+            await export_storage.save(key, path)
+
+        except Exception as e:
+            logger.exception("Export job %s failed", job.id)
+            await export_storage.discard(key, path)
+            await job.set({
+                "status": "failed",
+                "error": str(e),
+                "finished_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc),
+            })
+            return True
+
+        await job.set({
+            "status": "completed",
+            "artifact_key": key,
+            "finished_at": datetime.now(timezone.utc),
+            "updated_at": datetime.now(timezone.utc),
+        })
+        return True
+
+    async def expire(self) -> int:
+        """Delete finished jobs older than EXPORT_RETENTION_HOURS along
+        with their files; returns how many were removed."""
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            hours=Config.EXPORT_RETENTION_HOURS)
+        collection = ExportJob.get_pymongo_collection()
+        expired = await collection.find(
+            {"status": {"$in": ["completed", "failed"]},
+             "updated_at": {"$lt": cutoff}},
+            {"artifact_key": 1},
+        ).to_list(None)
+
+        for doc in expired:
+            if doc.get("artifact_key"):
+                await export_storage.delete(doc["artifact_key"])
+        if expired:
+            await collection.delete_many(
+                {"_id": {"$in": [doc["_id"] for doc in expired]}}
+            )
+        return len(expired)
+
+    async def process_pending(self) -> int:
+        expired = await self.expire()
+        if expired:
+            logger.info("Deleted %d expired export job(s)", expired)
+        processed = 0
+        while await self.run():
+            processed += 1
+        return processed
+
+
+class ExportJobService:
+
+    async def get_job(self, job_id: str) -> ExportJob:
+        try:
+            job = await ExportJob.get(PydanticObjectId(job_id))
+        except InvalidId:
+            job = None
+
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Export job not found"
+            )
+        return job
+
+    async def create_job(self, data: ExportJobCreateSchema):
+        job = ExportJob(
+            format=data.format,
+            filters=pharmacist_svc.build_filters(
+                technical_group=data.technical_group,
+                induction_year=data.induction_year,
+            ),
+        )
+
+        await job.insert()
+        export_worker.dispatch(job.id)
+        return await ExportJobReadSchema.from_mongo(job)
+
+    async def get_job_status(self, job_id: str):
+        job = await self.get_job(job_id)
+        return await ExportJobReadSchema.from_mongo(job)
+
+    async def download_job_artifact(self, job_id: str):
+        job = await self.get_job(job_id)
+
+        if job.status != "completed" or not job.artifact_key:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Export is not ready (status: {job.status})"
+            )
+
+        response = await export_storage.response(
+            job.artifact_key,
+            media_type=MEDIA_TYPES[job.format],
+            filename=f"pharmacists.{job.format}",
+        )
+        if response is None:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Export file is no longer available"
+            )
+        return response
+
+
+export_worker = ExportWorker()
+export_job_svc = ExportJobService()
+
+
+async def main(poll_interval: float, once: bool) -> None:
+    from src.db.connection import init_db
+
+    client = await init_db()
+    try:
+        while True:
+            processed = await export_worker.process_pending()
+            if processed:
+                logger.info("Processed %d export job(s)", processed)
+            if once:
+                break
+            await asyncio.sleep(poll_interval)
+    finally:
+        client.close()
+
+
+def handler(event, context):
+    """Scheduled Lambda entry point: drain the queue once."""
+    asyncio.run(main(poll_interval=0, once=True))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run queued pharmacist export jobs.")
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument("--once", action="store_true",
+                        help="Drain the queue once and exit")
+    args = parser.parse_args()
+    asyncio.run(main(args.poll_interval, args.once))
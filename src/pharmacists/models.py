@@ -1,16 +1,19 @@
 from typing import Annotated
 from beanie import Document, Indexed
 from pydantic import Field, EmailStr
-from typing import Optional
+from pymongo import IndexModel
+from typing import Optional, Union
 from datetime import datetime, timezone, date
 
+from src.core.config import Config
+
 
 class Pharmacist(Document):
     email: Annotated[EmailStr, Indexed(unique=True)]
     full_name: str
     fellow: Optional[str] = None
     school_attended: Optional[str] = None
-    pcn_license_number: str
+    pcn_license_number: Annotated[str, Indexed(unique=True)]
     induction_year: int
     date_of_birth: Optional[date] = None
     residential_address: Optional[str] = None
@@ -29,3 +32,67 @@ class Pharmacist(Document):
 
     class Settings:
         name = "pharmacists"
+        # Directory pages filter on one or more of these fields and page
+        # by _id, so each index is the filter field followed by _id.
+        indexes = [
+            IndexModel([("technical_group", 1), ("_id", 1)],
+                       name="technical_group_id"),
+            IndexModel([("induction_year", 1), ("_id", 1)],
+                       name="induction_year_id"),
+            IndexModel([("interest_groups", 1), ("_id", 1)],
+                       name="interest_groups_id"),
+            IndexModel([("place_of_work", 1), ("_id", 1)],
+                       name="place_of_work_id"),
+        ]
+
+
+class ExportJob(Document):
+    format: str
+    filters: dict = {}
+    status: str = "queued"  # queued, running, completed, failed
+    total_rows: Optional[int] = None
+    rows_written: int = 0
+    artifact_key: Optional[str] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
+
+    class Settings:
+        name = "export_jobs"
+        indexes = [
+            "status",
+            # Backstop only: ExportWorker.expire deletes each job with its
+            # file after EXPORT_RETENTION_HOURS, well before this fires.
+            IndexModel(
+                [("updated_at", 1)],
+                name="updated_at_ttl",
+                expireAfterSeconds=Config.EXPORT_RETENTION_HOURS * 2 * 3600,
+            ),
+        ]
+
+
+class PharmacistStat(Document):
+    """Materialized member count for one value of one dimension, e.g.
+    ("gender", "F") or ("interest_groups", "Research")."""
+    dimension: str
+    value: Optional[Union[int, str]] = None
+    members: int = 0
+    # Id of the rebuild that last set `members`; cleared by every
+    # incremental update so a later rebuild never sweeps the row away.
+    generation: Optional[str] = None
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
+
+    class Settings:
+        name = "pharmacist_stats"
+        indexes = [
+            IndexModel([("dimension", 1), ("value", 1)],
+                       name="dimension_value", unique=True),
+        ]
@@ -1,28 +1,88 @@
+from typing import Literal
+
 from fastapi import (
-    APIRouter, Request, status, Query, UploadFile, File
+    APIRouter, Request, Response, status, Query, UploadFile, File, Depends
 )
 
 from src.pharmacists.schemas import (
-    PharmacistReadSchema, PharmacistCreateSchema, PharmacistUpdateSchema
+    PharmacistReadSchema, PharmacistCreateSchema, PharmacistUpdateSchema,
+    ExportJobCreateSchema, ExportJobReadSchema, PharmacistImportReportSchema,
+    PharmacistSearchResultSchema, PharmacistStatsSchema
 )
 # from src.core.dependencies import (
 #     RoleChecker, get_current_user, get_token_details
 # )
+from src.core.conditional import ConditionalGet
+from src.core.dependencies import require_admin
+from src.core.responses import raw_json_response
 
 from src.pharmacists.services import pharmacist_svc
+from src.pharmacists.jobs import export_job_svc
+from src.pharmacists.imports import pharmacist_import_svc
 
 
 pharmacists_router = APIRouter()
+
+
+pharmacists_conditional = ConditionalGet(
+    lambda request: pharmacist_svc.get_pharmacists_version()
+)
+pharmacist_conditional = ConditionalGet(
+    lambda request: pharmacist_svc.get_pharmacist_version(
+        request.path_params["license_number"]
+    )
+)
 # role_checker = RoleChecker(["admin", "customer"])
 # admin_role = RoleChecker(["admin"])
 
 
 @pharmacists_router.get("", response_model=list[PharmacistReadSchema],
-                        status_code=status.HTTP_200_OK)
-async def get_pharmacists(request: Request,
-                          technical_group: str | None = Query(default=None)):
-    pharmacists = await pharmacist_svc.get_all_pharmacists(technical_group)
-    return pharmacists
+                        status_code=status.HTTP_200_OK,
+                        dependencies=[Depends(pharmacists_conditional)])
+async def get_pharmacists(
+    request: Request,
+    response: Response,
+    technical_group: str | None = Query(default=None),
+    induction_year: int | None = Query(default=None),
+    interest_groups: str | None = Query(
+        default=None, description="Comma-separated; matches any"
+    ),
+    place_of_work: str | None = Query(default=None),
+    fields: str | None = Query(
+        default=None,
+        description="Comma-separated subset of fields to return"
+    ),
+    limit: int | None = Query(
+        default=None, ge=1, le=200,
+        description=("Page size. Setting `limit` or `cursor` switches the "
+                     "response to `{items, next_cursor, limit}`")
+    ),
+    cursor: str | None = Query(default=None),
+):
+    filters = pharmacist_svc.build_filters(
+        technical_group=technical_group,
+        induction_year=induction_year,
+        interest_groups=interest_groups,
+        place_of_work=place_of_work,
+    )
+
+    if limit is None and cursor is None:
+        pharmacists = await pharmacist_svc.get_all_pharmacists(filters,
+                                                               fields)
+        return raw_json_response(pharmacists, response)
+
+    limit = limit or 50
+    items, next_cursor = await pharmacist_svc.get_pharmacists_page(
+        limit=limit,
+        cursor=cursor,
+        filters=filters,
+        fields=fields,
+    )
+    return raw_json_response({
+        "items": items,
+        "next_cursor": next_cursor,
+        "limit": limit,
+    }, response)
 
 
 @pharmacists_router.post("", response_model=PharmacistReadSchema,
@@ -32,9 +92,47 @@ async def add_pharmacist(request: Request, data: PharmacistCreateSchema):
     return pharmacist
 
 
+@pharmacists_router.get("/stats", response_model=PharmacistStatsSchema,
+                        status_code=status.HTTP_200_OK,
+                        dependencies=[Depends(require_admin)])
+async def get_pharmacist_stats(request: Request):
+    stats = await pharmacist_svc.get_stats()
+    return stats
+
+
+@pharmacists_router.get("/search",
+                        response_model=list[PharmacistSearchResultSchema],
+                        status_code=status.HTTP_200_OK)
+async def search_pharmacists(
+    request: Request,
+    q: str = Query(min_length=2, max_length=100,
+                   description="Name, workplace or school; typos allowed"),
+    limit: int = Query(default=20, ge=1, le=100),
+):
+    results = await pharmacist_svc.search_pharmacists(q, limit)
+    return results
+
+
+@pharmacists_router.post("/import",
+                         response_model=PharmacistImportReportSchema,
+                         status_code=status.HTTP_200_OK,
+                         dependencies=[Depends(require_admin)])
+async def import_pharmacists(
+    request: Request,
+    file: UploadFile = File(...),
+    format: Literal["csv", "xlsx", "jsonl"] | None = Query(
+        default=None,
+        description="Defaults to the uploaded file's extension"
+    ),
+):
+    report = await pharmacist_import_svc.import_pharmacists(file, format)
+    return report
+
+
 @pharmacists_router.get("/{license_number}",
                         response_model=PharmacistReadSchema,
-                        status_code=status.HTTP_200_OK)
+                        status_code=status.HTTP_200_OK,
+                        dependencies=[Depends(pharmacist_conditional)])
 async def get_pharmacist(request: Request, license_number: str):
     pharmacist = await pharmacist_svc.get_a_pharmacist(license_number)
     return pharmacist
@@ -79,6 +177,30 @@ async def export_pharmacists_excel(request: Request):
     return result
 
 
+@pharmacists_router.post("/export", response_model=ExportJobReadSchema,
+                         status_code=status.HTTP_202_ACCEPTED,
+                         dependencies=[Depends(require_admin)])
+async def create_export_job(request: Request, data: ExportJobCreateSchema):
+    job = await export_job_svc.create_job(data)
+    return job
+
+
+@pharmacists_router.get("/export/{job_id}",
+                        response_model=ExportJobReadSchema,
+                        status_code=status.HTTP_200_OK,
+                        dependencies=[Depends(require_admin)])
+async def get_export_job(request: Request, job_id: str):
+    job = await export_job_svc.get_job_status(job_id)
+    return job
+
+
+@pharmacists_router.get("/export/{job_id}/download",
+                        dependencies=[Depends(require_admin)])
+async def download_export_job(request: Request, job_id: str):
+    result = await export_job_svc.download_job_artifact(job_id)
+    return result
+
+
 # @pharmacists_router.get("/{uid}", response_model=PharmacistReadSchema,
 #                         status_code=status.HTTP_200_OK)
 # async def get_pharmacist(request: Request, session: SessionDep,
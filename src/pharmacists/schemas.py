@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, ConfigDict
 from bson import ObjectId
 
@@ -85,3 +85,85 @@ class PharmacistReadSchema(PharmacistBaseSchema):
             data['_id'] = str(data['_id'])
 
         return cls(**data)
+
+
+class ExportJobCreateSchema(BaseModel):
+    format: Literal["csv", "xlsx"] = "csv"
+    technical_group: Optional[str] = None
+    induction_year: Optional[int] = None
+
+
+class ExportJobReadSchema(BaseModel):
+    id: str = Field(alias="_id", json_schema_extra={
+        "example": "652c1e6fcf9b7f001f3f5a2b"
+    })
+    format: str
+    filters: dict
+    status: str
+    total_rows: Optional[int] = None
+    rows_written: int
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True,
+        json_encoders={ObjectId: str}
+    )
+
+    @classmethod
+    async def from_mongo(cls, job):
+        if isinstance(job, dict):
+            data = job.copy()
+        else:
+            data = job.model_dump(by_alias=True)
+
+        if "_id" in data:
+            data['_id'] = str(data['_id'])
+
+        return cls(**data)
+
+
+class PharmacistImportErrorSchema(BaseModel):
+    row: int
+    pcn_license_number: Optional[str] = None
+    errors: List[str]
+
+
+class PharmacistImportReportSchema(BaseModel):
+    total_rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[PharmacistImportErrorSchema] = Field(default_factory=list)
+    errors_truncated: bool = False
+
+
+class PharmacistSearchResultSchema(BaseModel):
+    id: str = Field(alias="_id", json_schema_extra={
+        "example": "652c1e6fcf9b7f001f3f5a2b"
+    })
+    full_name: str
+    pcn_license_number: str
+    technical_group: Optional[str] = None
+    place_of_work: Optional[str] = None
+    school_attended: Optional[str] = None
+    score: float
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class PharmacistStatCountSchema(BaseModel):
+    value: Optional[int | str] = None
+    count: int
+
+
+class PharmacistStatsSchema(BaseModel):
+    total: int
+    technical_group: List[PharmacistStatCountSchema]
+    gender: List[PharmacistStatCountSchema]
+    induction_year: List[PharmacistStatCountSchema]
+    interest_groups: List[PharmacistStatCountSchema]
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,335 @@
+"""In-process fuzzy index for pharmacist search.
+
+Members are indexed by the words of `full_name`, `place_of_work` and
+`school_attended`. Each distinct word is also split into padded
+trigrams ("  jo", " jon", "joh", ...), so a query word is first expanded
+to the vocabulary words it resembles (Dice coefficient of shared
+trigrams, with a boost for prefixes). The expansions select members
+through plain set unions and intersections; only the resulting
+candidates are scored.
+
+Members are added and removed in place by the service write paths.
+Each worker process holds its own copy, so it also re-syncs with the
+collection when its data is older than PHARMACIST_SEARCH_REFRESH_SECONDS.
+"""
+import asyncio
+import heapq
+import logging
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from itertools import islice, repeat
+from typing import Iterable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from src.core.conditional import list_versions
+from src.core.config import Config
+from src.pharmacists.models import Pharmacist
+
+logger = logging.getLogger("psnaks")
+
+SEARCH_FIELDS = ("full_name", "place_of_work", "school_attended")
+FIELD_WEIGHTS = (1.0, 0.8, 0.6)
+
+RESULT_FIELDS = ("pcn_license_number", "technical_group", *SEARCH_FIELDS)
+
+MIN_WORD_SIMILARITY = 0.4
+MAX_EXPANSIONS = 30
+MAX_QUERY_WORDS = 8
+MAX_CANDIDATES = 500
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text)
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    return _WORD_RE.findall(text)
+
+
+def trigrams(word: str) -> set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class _IndexState:
+    docs: dict[int, dict] = field(default_factory=dict)
+    doc_words: dict[int, tuple] = field(default_factory=dict)
+    slots: dict[str, int] = field(default_factory=dict)
+    # words[f][word] -> slots whose field f contains word
+    words: tuple = field(
+        default_factory=lambda: tuple({} for _ in SEARCH_FIELDS)
+    )
+    # vocabulary word -> (trigram count, number of fields using it)
+    vocab: dict[str, list] = field(default_factory=dict)
+    grams: dict[str, set] = field(default_factory=lambda: defaultdict(set))
+    next_slot: int = 0
+
+    def add(self, doc: dict) -> None:
+        key = str(doc["_id"])
+        slot = self.next_slot
+        self.next_slot += 1
+
+        self.docs[slot] = {"_id": key,
+                           **{f: doc.get(f) for f in RESULT_FIELDS}}
+        self.slots[key] = slot
+
+        doc_words = tuple(tuple(dict.fromkeys(tokenize(doc.get(f))))
+                          for f in SEARCH_FIELDS)
+        self.doc_words[slot] = doc_words
+
+        for offset, field_words in enumerate(doc_words):
+            postings = self.words[offset]
+            for word in field_words:
+                members = postings.get(word)
+                if members is None:
+                    members = postings[word] = set()
+                    self._add_vocab(word)
+                members.add(slot)
+
+    def remove(self, key: str) -> None:
+        slot = self.slots.pop(key, None)
+        if slot is None:
+            return
+
+        del self.docs[slot]
+        for offset, field_words in enumerate(self.doc_words.pop(slot)):
+            postings = self.words[offset]
+            for word in field_words:
+                members = postings[word]
+                members.discard(slot)
+                if not members:
+                    del postings[word]
+                    self._remove_vocab(word)
+
+    def _add_vocab(self, word: str) -> None:
+        entry = self.vocab.get(word)
+        if entry is None:
+            grams = trigrams(word)
+            for gram in grams:
+                self.grams[gram].add(word)
+            self.vocab[word] = [len(grams), 1]
+        else:
+            entry[1] += 1
+
+    def _remove_vocab(self, word: str) -> None:
+        entry = self.vocab[word]
+        if entry[1] > 1:
+            entry[1] -= 1
+            return
+
+        del self.vocab[word]
+        for gram in trigrams(word):
+            words = self.grams[gram]
+            words.discard(word)
+            if not words:
+                del self.grams[gram]
+
+    def expand(self, word: str) -> dict[str, float]:
+        """Vocabulary words resembling `word`, with their similarity."""
+        grams = trigrams(word)
+        hits = Counter()
+        for gram in grams:
+            words = self.grams.get(gram)
+            if words:
+                hits.update(words)
+
+        similar = {}
+        for candidate, shared in hits.items():
+            score = 2 * shared / (len(grams) + self.vocab[candidate][0])
+            if candidate.startswith(word):
+                score = max(score, 0.5 + 0.5 * len(word) / len(candidate))
+            if score >= MIN_WORD_SIMILARITY:
+                similar[candidate] = score
+
+        return dict(heapq.nlargest(MAX_EXPANSIONS, similar.items(),
+                                   key=lambda item: item[1]))
+
+    def members(self, expansions: dict[str, float]) -> list[set]:
+        """Member sets for `expansions`, most similar words first."""
+        return [postings[word]
+                for word in expansions
+                for postings in self.words if word in postings]
+
+
+def _build(docs: Iterable[dict]) -> _IndexState:
+    state = _IndexState()
+    for doc in docs:
+        state.add(doc)
+    return state
+
+
+def _intersect(candidates: set, member_sets: list[set]) -> set:
+    matched = set()
+    for members in member_sets:
+        matched |= candidates & members
+    return matched
+
+
+def _ranked(candidates: set, member_sets: list[set]):
+    """`candidates` ordered by the closest word they matched."""
+    seen = set()
+    for members in member_sets:
+        for slot in members:
+            if slot in candidates and slot not in seen:
+                seen.add(slot)
+                yield slot
+
+
+class PharmacistSearchIndex:
+
+    def __init__(self):
+        self._state: Optional[_IndexState] = None
+        self._synced_at = 0.0
+        self._version = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._state.slots) if self._state else 0
+
+    def load(self, docs: Iterable[dict]) -> None:
+        self._state = _build(docs)
+        self._synced_at = time.monotonic()
+
+    async def rebuild(self) -> None:
+        current = await list_versions.current("pharmacists")
+        projection = {f: 1 for f in RESULT_FIELDS}
+        docs = await Pharmacist.aggregate(
+            [{"$project": projection}], batchSize=5000
+        ).to_list()
+
+        self._state = await run_in_threadpool(_build, docs)
+        self._version = current["generation"]
+        self._synced_at = time.monotonic()
+        logger.info("Pharmacist search index built with %d entries",
+                    self.size)
+
+    async def _refresh(self) -> None:
+        try:
+            current = await list_versions.current("pharmacists")
+            if current["generation"] != self._version:
+                await self.rebuild()
+            else:
+                self._synced_at = time.monotonic()
+        except Exception:
+            logger.exception("Pharmacist search index refresh failed")
+
+    def schedule_rebuild(self) -> None:
+        """Re-read the collection in the background, e.g. after a bulk
+        import."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._version = None
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def ensure_ready(self) -> None:
+        if self._state is None:
+            async with self._lock:
+                if self._state is None:
+                    await self.rebuild()
+            return
+
+        age = time.monotonic() - self._synced_at
+        if age > Config.PHARMACIST_SEARCH_REFRESH_SECONDS:
+            self.schedule_rebuild()
+
+    def upsert(self, doc: dict) -> None:
+        if self._state is None:
+            return
+        self._state.remove(str(doc["_id"]))
+        self._state.add(doc)
+
+    def remove(self, key) -> None:
+        if self._state is None:
+            return
+        self._state.remove(str(key))
+
+    @staticmethod
+    def _candidates(state: _IndexState, member_sets: list[list[set]]):
+        """Members matching every query word, narrowing from the rarest.
+
+        Words matching most members ("of", "hospital") barely narrow and
+        are only used for scoring; a word that would leave no candidates
+        at all is ignored. Returns None when no word matches anyone.
+        """
+        sizes = [sum(map(len, sets)) for sets in member_sets]
+        order = sorted((i for i in range(len(sizes)) if sizes[i]),
+                       key=sizes.__getitem__)
+        if not order:
+            return None
+
+        candidates = set().union(*member_sets[order[0]])
+        for i in order[1:]:
+            if sizes[i] > len(state.slots) // 2:
+                break
+            narrowed = _intersect(candidates, member_sets[i])
+            if narrowed:
+                candidates = narrowed
+
+        if len(candidates) > MAX_CANDIDATES:
+            return islice(
+                _ranked(candidates, member_sets[order[0]]), MAX_CANDIDATES
+            )
+        return candidates
+
+    @staticmethod
+    def _scorer(state: _IndexState, expansions: list[dict]):
+        """A function scoring one member slot against `expansions`.
+
+        Field values repeat across members (workplaces, schools), so the
+        per-word scores of each distinct value are computed once; values
+        sharing no word with any expansion (most names, when the query
+        is a school) score zero without a lookup.
+        """
+        field_scores = {}
+        expanded = set().union(*expansions)
+        no_match = (0.0,) * len(expansions)
+
+        def value_scores(weight: float, field_words: tuple) -> tuple:
+            if expanded.isdisjoint(field_words):
+                return no_match
+            cached = field_scores.get((weight, field_words))
+            if cached is None:
+                cached = field_scores[(weight, field_words)] = tuple(
+                    weight * max(map(similar.get, field_words,
+                                     repeat(0.0)), default=0.0)
+                    for similar in expansions
+                )
+            return cached
+
+        def score(slot: int) -> float:
+            per_field = [value_scores(weight, field_words)
+                         for weight, field_words in zip(
+                             FIELD_WEIGHTS, state.doc_words[slot])]
+            return sum(map(max, *per_field)) / len(expansions)
+
+        return score
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        state = self._state
+        query_words = list(dict.fromkeys(tokenize(query)))
+        if state is None or not query_words:
+            return []
+
+        expansions = [state.expand(word)
+                      for word in query_words[:MAX_QUERY_WORDS]]
+        candidates = self._candidates(
+            state, [state.members(e) for e in expansions]
+        )
+        if candidates is None:
+            return []
+
+        score = self._scorer(state, expansions)
+        scored = ((score(slot), slot) for slot in candidates)
+        return [{**state.docs[slot], "score": round(value, 4)}
+                for value, slot in heapq.nlargest(limit, scored)]
+
+
+pharmacist_search_index = PharmacistSearchIndex()
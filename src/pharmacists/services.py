@@ -1,17 +1,30 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Tuple
 import csv
-from fastapi.responses import StreamingResponse
-from io import StringIO, BytesIO
+import os
+import tempfile
+from fastapi.responses import StreamingResponse, FileResponse
+from io import StringIO
 
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from fastapi.responses import JSONResponse
 from fastapi import File, HTTPException, status
-from openpyxl import Workbook
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
+from src.core.config import Config
+from src.core.conditional import (
+    ResourceVersion, document_version, list_versions
+)
+from src.core.responses import mongo_projection
+from src.utils.cursor import encode_cursor, decode_cursor
 from src.pharmacists.models import Pharmacist
 from src.pharmacists.schemas import (
     PharmacistCreateSchema, PharmacistReadSchema, PharmacistUpdateSchema
 )
+from src.pharmacists.search import pharmacist_search_index
+from src.pharmacists.stats import STAT_DIMENSIONS, pharmacist_stats_svc
 from src.utils.cloudinary import upload_to_cloudinary
 
 # from src.core.security import BearerTokenClass, PWDHashing
@@ -20,9 +33,72 @@ from src.utils.cloudinary import upload_to_cloudinary
 # pwd_hashing = PWDHashing()
 # jwt_bearer_token = BearerTokenClass()
 
+EXPORT_FIELDS = ["email", "full_name", "fellow", "school_attended",
+                 "pcn_license_number", "induction_year", "date_of_birth",
+                 "residential_address", "place_of_work", "technical_group",
+                 "interest_groups", "gender", "created_at"]
+
+EXPORT_BATCH_SIZE = 1000
+
+XLSX_MEDIA_TYPE = ("application/vnd.openxmlformats-officedocument."
+                   "spreadsheetml.sheet")
+
+PHARMACIST_PROJECTION = mongo_projection(
+    PharmacistReadSchema,
+    date_of_birth={"$dateToString": {
+        "format": "%Y-%m-%d", "date": "$date_of_birth"
+    }},
+)
+
 
 class PharmacistService:
 
+    def build_filters(self,
+                      technical_group: Optional[str] = None,
+                      induction_year: Optional[int] = None,
+                      interest_groups: Optional[str] = None,
+                      place_of_work: Optional[str] = None) -> dict:
+        filters = {}
+        if technical_group:
+            filters["technical_group"] = technical_group
+        if induction_year is not None:
+            filters["induction_year"] = induction_year
+        if interest_groups:
+            group_list = [g.strip()
+                          for g in interest_groups.split(",") if g.strip()]
+            if group_list:
+                filters["interest_groups"] = {"$in": group_list}
+        if place_of_work:
+            filters["place_of_work"] = place_of_work
+        return filters
+
+    def build_projection(self, fields: Optional[str] = None) -> dict:
+        if not fields:
+            return PHARMACIST_PROJECTION
+
+        selected = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = selected - PHARMACIST_PROJECTION.keys()
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+
+        selected.add("_id")
+        return {key: value for key, value in PHARMACIST_PROJECTION.items()
+                if key in selected}
+
+    async def get_pharmacist_version(
+        self,
+        license_number: str
+    ) -> Optional[ResourceVersion]:
+        return await document_version(
+            Pharmacist, Pharmacist.pcn_license_number == license_number
+        )
+
+    async def get_pharmacists_version(self) -> ResourceVersion:
+        return await list_versions.version("pharmacists")
+
     async def get_pharmacist_by_license_number(self,
                                                license_number: str):
         pharmacist = await Pharmacist.find_one(
@@ -36,22 +112,64 @@ class PharmacistService:
         return pharmacist
 
     async def get_all_pharmacists(self,
-                                  technical_group: Optional[str] = None):
-
-        if technical_group:
-            pharmacists = await Pharmacist.find(
-                Pharmacist.technical_group == technical_group
-            ).to_list()
-        else:
-            pharmacists = await Pharmacist.find_all().to_list()
-
-        return [await PharmacistReadSchema.from_mongo(p) for p in pharmacists]
+                                  filters: Optional[dict] = None,
+                                  fields: Optional[str] = None):
+
+        return await Pharmacist.aggregate([
+            {"$match": filters or {}},
+            {"$project": self.build_projection(fields)},
+        ]).to_list()
+
+    async def get_pharmacists_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        filters: Optional[dict] = None,
+        fields: Optional[str] = None,
+    ) -> Tuple[list[dict], Optional[str]]:
+
+        filters = dict(filters or {})
+        if cursor:
+            [last_id] = decode_cursor(cursor, (ObjectId,))
+            filters["_id"] = {"$gt": last_id}
+
+        results = await Pharmacist.aggregate([
+            {"$match": filters},
+            {"$sort": {"_id": 1}},
+            {"$limit": limit + 1},
+            {"$project": self.build_projection(fields)},
+        ]).to_list()
+
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = encode_cursor(ObjectId(results[-1]["_id"]))
+
+        return results, next_cursor
+
+    async def get_stats(self):
+        return await pharmacist_stats_svc.get_stats()
+
+    async def search_pharmacists(self, q: str, limit: int = 20):
+        await pharmacist_search_index.ensure_ready()
+        return pharmacist_search_index.search(q, limit)
 
     async def add_a_pharmacist(self,
                                data: PharmacistCreateSchema):
         pharmacist = Pharmacist(**data.model_dump())
 
-        await pharmacist.insert()
+        try:
+            await pharmacist.insert()
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A pharmacist with this email or license number "
+                       "already exists"
+            )
+
+        await pharmacist_stats_svc.apply(after=pharmacist.model_dump())
+        pharmacist_search_index.upsert(pharmacist.model_dump(by_alias=True))
+        await list_versions.bump("pharmacists")
         return await PharmacistReadSchema.from_mongo(pharmacist)
 
     async def get_a_pharmacist(self,
@@ -67,11 +185,26 @@ class PharmacistService:
         pharmacist = await self.get_pharmacist_by_license_number(
             license_number)
 
+        before = pharmacist.model_dump(include=set(STAT_DIMENSIONS))
         update_data = data.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(pharmacist, key, value)
 
-        await pharmacist.save()
+        pharmacist.updated_at = datetime.now(timezone.utc)
+        try:
+            await pharmacist.save()
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A pharmacist with this email or license number "
+                       "already exists"
+            )
+
+        await pharmacist_stats_svc.apply(
+            before, pharmacist.model_dump(include=set(STAT_DIMENSIONS))
+        )
+        pharmacist_search_index.upsert(pharmacist.model_dump(by_alias=True))
+        await list_versions.bump("pharmacists")
         return await PharmacistReadSchema.from_mongo(pharmacist)
 
     async def delete_a_pharmacist(self,
@@ -80,6 +213,9 @@ class PharmacistService:
         pharmacist = await self.get_pharmacist_by_license_number(
             license_number)
         await pharmacist.delete()
+        await pharmacist_stats_svc.apply(before=pharmacist.model_dump())
+        pharmacist_search_index.remove(pharmacist.id)
+        await list_versions.bump("pharmacists")
 
         return JSONResponse(
             content="Pharmacist deleted successfully",
@@ -109,81 +245,129 @@ class PharmacistService:
             "profile_picture": image_url,
             "updated_at": datetime.now(timezone.utc),
         })
+        await list_versions.bump("pharmacists")
 
         return JSONResponse(
             content="Profile Image uploaded successfully",
             status_code=status.HTTP_200_OK
         )
 
-    async def export_pharmacists_csv(self):
-        pharmacists = await Pharmacist.find().to_list()
+    async def iter_export_rows(self,
+                               filters: Optional[dict] = None,
+                               batch_size: int = EXPORT_BATCH_SIZE):
+        """Yield export rows in lists of up to `batch_size`, reading the
+        collection through a projected cursor."""
 
-        output = StringIO()
-        writer = csv.writer(output)
+        projection = {field: 1 for field in EXPORT_FIELDS}
+        projection["_id"] = 0
+
+        cursor = Pharmacist.aggregate(
+            [{"$match": filters or {}}, {"$project": projection}],
+            batchSize=batch_size,
+        )
 
-        fields = ["email", "full_name", "fellow", "school_attended",
-                  "pcn_license_number", "induction_year", "date_of_birth",
-                  "residential_address", "place_of_work", "technical_group",
-                  "interest_groups", "gender", "created_at"]
+        rows = []
+        async for doc in cursor:
+            date_of_birth = doc.get("date_of_birth")
+            if isinstance(date_of_birth, datetime):
+                doc["date_of_birth"] = date_of_birth.date()
+            rows.append([doc.get(field) for field in EXPORT_FIELDS])
 
-        writer.writerow(fields)
+            if len(rows) >= batch_size:
+                yield rows
+                rows = []
 
-        for a in pharmacists:
-            writer.writerow(
-                [a.email, a.full_name, a.fellow, a.school_attended,
-                 a.pcn_license_number, a.induction_year, a.date_of_birth,
-                 a.residential_address, a.place_of_work, a.technical_group,
-                 a.interest_groups, a.gender, a.created_at
-                 ])
+        if rows:
+            yield rows
 
-        output.seek(0)
+    async def stream_pharmacists_csv(self, filters: Optional[dict] = None):
+        output = StringIO()
+        writer = csv.writer(output)
+
+        writer.writerow(EXPORT_FIELDS)
+        yield output.getvalue()
+
+        async for rows in self.iter_export_rows(filters):
+            output.seek(0)
+            output.truncate(0)
+            writer.writerows(rows)
+            yield output.getvalue()
+
+    async def write_pharmacists_csv(self, path: str,
+                                    filters: Optional[dict] = None,
+                                    progress=None):
+        """File writes run in the threadpool, off the event loop."""
+
+        handle = await run_in_threadpool(open, path, "w", newline="",
+                                         encoding="utf-8")
+        try:
+            writer = csv.writer(handle)
+            await run_in_threadpool(writer.writerow, EXPORT_FIELDS)
+
+            async for rows in self.iter_export_rows(filters):
+                await run_in_threadpool(writer.writerows, rows)
+                if progress:
+                    await progress(len(rows))
+        finally:
+            await run_in_threadpool(handle.close)
+
+    async def export_pharmacists_csv(self):
         headers = {
             "Content-Disposition": "attachment; filename=pharmacists.csv"
         }
         return StreamingResponse(
-            output,
+            self.stream_pharmacists_csv(),
             media_type="text/csv",
             headers=headers
         )
 
-    async def export_pharmacists_excel(self):
-        pharmacists = await Pharmacist.find().to_list()
-
-        fields = ["email", "full_name", "fellow", "school_attended",
-                  "pcn_license_number", "induction_year", "date_of_birth",
-                  "residential_address", "place_of_work", "technical_group",
-                  "interest_groups", "gender", "created_at"]
-
-        wb = Workbook()
-        ws = wb.active
-        ws.append(fields)
-
-        for a in pharmacists:
-            ws.append(
-                [a.email, a.full_name, a.fellow, a.school_attended,
-                 a.pcn_license_number, a.induction_year, a.date_of_birth,
-                 a.residential_address, a.place_of_work, a.technical_group,
-                 ", ".join(a.interest_groups or []),
-                 a.gender, a.created_at
-                 ]
-            )
+    async def write_pharmacists_excel(self, path: str,
+                                      filters: Optional[dict] = None,
+                                      progress=None):
+        """Write the export to `path` with a write-only workbook, which
+        flushes rows to disk instead of keeping every cell in memory."""
 
-        buffer = BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+        from openpyxl import Workbook
 
-        headers = {
-            "Content-Disposition": "attachment; filename=pharmacists.csv"
-        }
+        async def run(func, *args):
+            if Config.EXPORT_EXCEL_IN_THREADPOOL:
+                return await run_in_threadpool(func, *args)
+            return func(*args)
 
-        return StreamingResponse(
-            buffer,
-            media_type=(
-                ("application/vnd.openxmlformats-officedocument."
-                 "spreadsheetml.sheet")
-            ),
-            headers=headers
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Pharmacists")
+        ws.append(EXPORT_FIELDS)
+
+        async for rows in self.iter_export_rows(filters):
+            await run(_append_excel_rows, ws, rows)
+            if progress:
+                await progress(len(rows))
+
+        await run(wb.save, path)
+
+    async def export_pharmacists_excel(self):
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+
+        try:
+            await self.write_pharmacists_excel(path)
+        except Exception:
+            os.remove(path)
+            raise
+
+        return FileResponse(
+            path,
+            media_type=XLSX_MEDIA_TYPE,
+            filename="pharmacists.xlsx",
+            background=BackgroundTask(os.remove, path)
         )
 
 
+def _append_excel_rows(ws, rows: list[list]) -> None:
+    groups_index = EXPORT_FIELDS.index("interest_groups")
+    for row in rows:
+        row[groups_index] = ", ".join(row[groups_index] or [])
+        ws.append(row)
+
+
 pharmacist_svc = PharmacistService()
@@ -0,0 +1,160 @@
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import uuid4
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from src.pharmacists.models import Pharmacist, PharmacistStat
+from src.pharmacists.schemas import PharmacistStatsSchema
+
+logger = logging.getLogger("psnaks")
+
+STAT_DIMENSIONS = ("technical_group", "gender", "induction_year",
+                   "interest_groups")
+
+TOTAL = ("total", None)
+
+
+def _contributions(doc: Optional[dict]) -> Counter:
+    """The (dimension, value) counters a single pharmacist adds to."""
+    counts = Counter()
+    if doc is None:
+        return counts
+
+    counts[TOTAL] += 1
+    for dimension in STAT_DIMENSIONS:
+        value = doc.get(dimension)
+        if dimension == "interest_groups":
+            for group in set(value or []):
+                counts[(dimension, group)] += 1
+        else:
+            counts[(dimension, value)] += 1
+    return counts
+
+
+class PharmacistStatsService:
+    """Membership counts kept as PharmacistStat rollups.
+
+    Writes in PharmacistService adjust the affected counters with `$inc`;
+    `rebuild` recomputes every counter from the pharmacists collection
+    and runs on first read, after bulk imports and whenever an
+    incremental update failed or raced a rebuild.
+    """
+
+    def __init__(self):
+        self._stale = False
+
+    async def apply(self,
+                    before: Optional[dict] = None,
+                    after: Optional[dict] = None) -> None:
+        delta = _contributions(after)
+        delta.subtract(_contributions(before))
+
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                {"dimension": dimension, "value": value},
+                {"$inc": {"members": change},
+                 "$set": {"updated_at": now},
+                 "$unset": {"generation": ""}},
+                upsert=True,
+            )
+            for (dimension, value), change in delta.items() if change
+        ]
+        if not operations:
+            return
+
+        try:
+            await PharmacistStat.get_pymongo_collection().bulk_write(
+                operations, ordered=False
+            )
+        except PyMongoError:
+            logger.exception("Failed to update pharmacist stats")
+            self._stale = True
+
+    async def rebuild(self) -> None:
+        generation = uuid4().hex
+        started = datetime.now(timezone.utc)
+        group = {"count": {"$sum": 1}}
+        facets = {
+            dimension: [{"$group": {"_id": f"${dimension}", **group}}]
+            for dimension in STAT_DIMENSIONS
+        }
+        facets["interest_groups"] = [
+            {"$project": {"group": {"$setUnion": ["$interest_groups", []]}}},
+            {"$unwind": "$group"},
+            {"$group": {"_id": "$group", **group}},
+        ]
+        facets["total"] = [{"$group": {"_id": None, **group}}]
+
+        [result] = await Pharmacist.aggregate(
+            [{"$facet": facets}]
+        ).to_list()
+
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                {"dimension": dimension, "value": row["_id"]},
+                {"$set": {"members": row["count"], "updated_at": now,
+                          "generation": generation}},
+                upsert=True,
+            )
+            for dimension, rows in result.items()
+            for row in rows
+        ]
+
+        collection = PharmacistStat.get_pymongo_collection()
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+        # Drop values an earlier rebuild counted and this one did not;
+        # rows `apply` touched since carry no generation and are kept.
+        await collection.delete_many(
+            {"generation": {"$exists": True, "$ne": generation}}
+        )
+        # An `apply` that ran while the aggregation was counting may be
+        # counted twice or not at all, so recount on the next read.
+        raced = await collection.find_one(
+            {"generation": None, "updated_at": {"$gte": started}}
+        )
+        self._stale = raced is not None
+
+    async def refresh(self) -> None:
+        try:
+            await self.rebuild()
+        except PyMongoError:
+            logger.exception("Failed to rebuild pharmacist stats")
+            self._stale = True
+
+    async def get_stats(self) -> PharmacistStatsSchema:
+        stats = await PharmacistStat.find_all().to_list()
+        if self._stale or not stats:
+            await self.rebuild()
+            stats = await PharmacistStat.find_all().to_list()
+
+        data = {dimension: [] for dimension in STAT_DIMENSIONS}
+        total = 0
+        for stat in stats:
+            if stat.dimension == TOTAL[0]:
+                total = stat.members
+            elif stat.dimension in data and stat.members > 0:
+                data[stat.dimension].append(
+                    {"value": stat.value, "count": stat.members}
+                )
+
+        for dimension, rows in data.items():
+            if dimension == "induction_year":
+                rows.sort(key=lambda row: row["value"] or 0)
+            else:
+                rows.sort(key=lambda row: (-row["count"], str(row["value"])))
+
+        return PharmacistStatsSchema(
+            total=total,
+            updated_at=max((s.updated_at for s in stats), default=None),
+            **data,
+        )
+
+
+pharmacist_stats_svc = PharmacistStatsService()
@@ -18,6 +18,7 @@ class QuizTopic(Document):
         name = "quiz_topics"
         indexes = [
             "title",
+            "slug",
         ]
 
 
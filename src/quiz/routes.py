@@ -1,5 +1,8 @@
 from typing import List
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response, Depends
+from src.core.cache import response_cache
+from src.core.conditional import ConditionalGet
+from src.core.responses import raw_json_response
 from src.quiz.models import QuizTopic, QuizQuestion
 from src.quiz.schemas import (
     QuizQuestionUpdate, QuizTopicCreate, QuizTopicRead, QuizTopicUpdate
@@ -9,10 +12,20 @@ from bson import ObjectId
 
 quiz_router = APIRouter()
 
+topics_conditional = ConditionalGet(
+    lambda request: quiz_svc.get_topics_version()
+)
+topic_conditional = ConditionalGet(
+    lambda request: quiz_svc.get_topic_version(request.path_params["slug"])
+)
+
 
-@quiz_router.get("/topics", response_model=List[QuizTopicRead])
-async def list_topics():
-    return await quiz_svc.list_topics()
+@quiz_router.get("/topics", response_model=List[QuizTopicRead],
+                 dependencies=[Depends(topics_conditional)])
+@response_cache.cached("quiz")
+async def list_topics(request: Request, response: Response):
+    topics = await quiz_svc.list_topics()
+    return raw_json_response(topics, response)
 
 
 @quiz_router.post("/topics", response_model=QuizTopic)
@@ -22,31 +35,22 @@ async def create_topic(topic: QuizTopicCreate):
 
 @quiz_router.get("/topics/{topic_id}", response_model=QuizTopic)
 async def get_topic_id(topic_id: str):
-    db_topic = await QuizTopic.get(topic_id)
-    if not db_topic:
-        raise HTTPException(404, "Topic not found")
-    return db_topic
+    return await quiz_svc.get_topic_by_id(topic_id)
 
 
 @quiz_router.put("/topics/{topic_id}", response_model=QuizTopic)
 async def update_topic(topic_id: str, topic: QuizTopicUpdate):
-    db_topic = await QuizTopic.get(topic_id)
-    if not db_topic:
-        raise HTTPException(404, "Topic not found")
-    await db_topic.update({"$set": topic.dict(exclude_unset=True)})
-    return db_topic
+    return await quiz_svc.update_topic(topic_id, topic)
 
 
 @quiz_router.delete("/topics/{topic_id}")
 async def delete_topic(topic_id: str):
-    db_topic = await QuizTopic.get(topic_id)
-    if not db_topic:
-        raise HTTPException(404, "Topic not found")
-    await db_topic.delete()
+    await quiz_svc.delete_topic(topic_id)
     return {"detail": "Deleted"}
 
 
-@quiz_router.get("/topics/slug/{slug}", response_model=QuizTopicRead)
+@quiz_router.get("/topics/slug/{slug}", response_model=QuizTopicRead,
+                 dependencies=[Depends(topic_conditional)])
 async def get_topic(slug: str):
     return await quiz_svc.get_topic(slug)
 
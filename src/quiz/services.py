@@ -1,15 +1,32 @@
+from datetime import datetime, timezone
+from typing import Optional
 from fastapi import HTTPException, status
 
+from src.core.cache import response_cache
+from src.core.conditional import (
+    ResourceVersion, document_version, list_versions
+)
+from src.core.responses import mongo_projection
 from src.quiz.models import QuizTopic
-from src.quiz.schemas import QuizTopicCreate, QuizTopicRead
+from src.quiz.schemas import QuizTopicCreate, QuizTopicRead, QuizTopicUpdate
 from src.utils.slugify import generate_slug_from_title
 
 
+QUIZ_TOPIC_PROJECTION = mongo_projection(QuizTopicRead)
+
+
 class QuizService:
-    async def list_topics(self):
-        quiz_topics = await QuizTopic.find_all().to_list()
+    async def get_topics_version(self) -> ResourceVersion:
+        return await list_versions.version("quiz")
+
+    async def get_topic_version(self,
+                                slug: str) -> Optional[ResourceVersion]:
+        return await document_version(QuizTopic, QuizTopic.slug == slug)
 
-        return [await QuizTopicRead.from_mongo(q) for q in quiz_topics]
+    async def list_topics(self):
+        return await QuizTopic.aggregate([
+            {"$project": QUIZ_TOPIC_PROJECTION},
+        ]).to_list()
 
     async def create_topic(self, topic: QuizTopicCreate):
 
@@ -22,8 +39,36 @@ class QuizService:
         )
 
         await quiz_topic.insert()
+        await response_cache.invalidate("quiz")
+        await list_versions.bump("quiz")
         return await QuizTopicRead.from_mongo(quiz_topic)
 
+    async def get_topic_by_id(self, topic_id: str) -> QuizTopic:
+        quiz_topic = await QuizTopic.get(topic_id)
+        if not quiz_topic:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Topic not found"
+            )
+        return quiz_topic
+
+    async def update_topic(self, topic_id: str, topic: QuizTopicUpdate):
+        quiz_topic = await self.get_topic_by_id(topic_id)
+
+        update_data = topic.model_dump(exclude_unset=True)
+        update_data["updated_at"] = datetime.now(timezone.utc)
+
+        await quiz_topic.update({"$set": update_data})
+        await response_cache.invalidate("quiz")
+        await list_versions.bump("quiz")
+        return quiz_topic
+
+    async def delete_topic(self, topic_id: str):
+        quiz_topic = await self.get_topic_by_id(topic_id)
+        await quiz_topic.delete()
+        await response_cache.invalidate("quiz")
+        await list_versions.bump("quiz")
+
     async def get_topic(self, slug: str):
         quiz_topic = await QuizTopic.find_one(QuizTopic.slug == slug)
         if not quiz_topic:
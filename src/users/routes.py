@@ -3,15 +3,15 @@ from fastapi import (
     APIRouter, HTTPException, status, Request, Depends,
     Response, BackgroundTasks
 )
+from src.core.responses import raw_json_response
 
 from src.core.dependencies import require_admin
 from src.users.schemas import (
     UserRegisterSchema, UserLoginSchema, UserReadSchema, UserLoginResponse,
     UserUpdateSchema, UserAdminRegisterSchema, PasswordResetRequestModel,
-    PasswordResetConfirmModel
+    PasswordResetConfirmModel, UserPrincipal
 )
 from src.users.services import user_svc
-from src.users.models import User
 
 
 user_router = APIRouter()
@@ -28,7 +28,8 @@ async def register_user(request: Request, user_data: UserRegisterSchema):
                   status_code=status.HTTP_201_CREATED)
 async def admin_register_user(request: Request,
                               user_data: UserAdminRegisterSchema,
-                              current_admin: User = Depends(require_admin)):
+                              current_admin: UserPrincipal = Depends(
+                                  require_admin)):
     return await user_svc.admin_register_user(user_data)
 
 
@@ -48,7 +49,8 @@ async def login_user(request: Request, user_data: UserLoginSchema,
 @user_router.get("", response_model=List[UserReadSchema],
                  status_code=status.HTTP_200_OK)
 async def get_users(request: Request):
-    return await user_svc.get_users()
+    users = await user_svc.get_users()
+    return raw_json_response(users)
 
 
 @user_router.get("/{user_id}", response_model=UserReadSchema,
@@ -71,12 +73,15 @@ async def delete_user_by_id(request: Request, user_id: str):
 
 
 @user_router.post("/logout", status_code=status.HTTP_200_OK)
-async def logout_user(response: Response):
-    response.delete_cookie(
-        key="access_token",
-        path="/"
-    )
-    return {"detail": "Logged out successfully"}
+async def logout_user(request: Request, response: Response):
+    tokens = [request.cookies.get("access_token"),
+              request.cookies.get("refresh_token")]
+
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        tokens.append(auth_header.split(" ", 1)[1])
+
+    return await user_svc.logout_user([t for t in tokens if t], response)
 
 
 @user_router.post("/auth/refresh",
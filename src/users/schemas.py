@@ -24,6 +24,14 @@ class UserMiniSchema(BaseModel):
     )
 
 
+class UserPrincipal(BaseModel):
+    """The authenticated user as seen by route dependencies."""
+    id: str
+    email: EmailStr
+    fullname: Optional[str] = None
+    is_admin: bool = False
+
+
 class UserRegisterSchema(BaseModel):
     email: EmailStr = Field(max_length=40)
     fullname: str
@@ -1,24 +1,37 @@
+import logging
 from datetime import datetime, timezone
 from fastapi import HTTPException, status, Response, BackgroundTasks
 from beanie import PydanticObjectId
+from bson.errors import InvalidId
 from fastapi.responses import JSONResponse
 
 from src.users.schemas import (
     UserRegisterSchema, UserLoginSchema, UserReadSchema,
     UserLoginResponse, UserUpdateSchema, UserAdminRegisterSchema,
-    PasswordResetRequestModel, PasswordResetConfirmModel
+    PasswordResetRequestModel, PasswordResetConfirmModel, UserPrincipal
 )
 from src.users.models import User
+from src.core.cache import create_cache_backend
+from src.core.metrics import record_cache_lookup
 from src.core.security import PWDHashing, BearerTokenClass
+from src.core.responses import mongo_projection
+from src.db.redis import token_blocklist
 
 from src.utils.url_token import create_url_safe_token, decode_url_safe_token
 from src.core.config import Config
 from src.utils.mail import send_resend_email_bg
 
+logger = logging.getLogger("psnaks")
 
 pwd_hashing = PWDHashing()
 jwt_bearer_token = BearerTokenClass()
 
+USER_PROJECTION = mongo_projection(UserReadSchema)
+
+# Authenticated users by id, so protected routes skip the users lookup.
+principal_cache = create_cache_backend(Config.PRINCIPAL_CACHE_BACKEND,
+                                       prefix="principal")
+
 
 class UserService:
 
@@ -26,6 +39,37 @@ class UserService:
         user = await User.find_one(User.email == email)
         return user
 
+    async def get_principal(self, user_id: str):
+        """The active user behind a token's `sub`, or None."""
+        if principal_cache is not None:
+            cached = await principal_cache.get(user_id)
+            record_cache_lookup("principal", cached is not None)
+            if cached is not None:
+                return UserPrincipal(**cached)
+
+        try:
+            user = await User.get(PydanticObjectId(user_id))
+        except InvalidId:
+            return None
+
+        if not user or user.deleted_at is not None:
+            return None
+
+        principal = UserPrincipal(
+            id=str(user.id),
+            email=user.email,
+            fullname=user.fullname,
+            is_admin=user.is_admin,
+        )
+        if principal_cache is not None:
+            await principal_cache.set(user_id, principal.model_dump(),
+                                      Config.PRINCIPAL_CACHE_TTL_SECONDS)
+        return principal
+
+    async def invalidate_principal(self, user_id) -> None:
+        if principal_cache is not None:
+            await principal_cache.delete(str(user_id))
+
     async def register_user(self, user_data: UserRegisterSchema):
         if await self.get_existing_user_by_email(user_data.email):
             raise HTTPException(
@@ -36,7 +80,7 @@ class UserService:
         user_data_dict = user_data.model_dump()
 
         user_data_dict["password_hash"] = \
-            pwd_hashing.generate_password_hash(
+            await pwd_hashing.generate_password_hash(
                 user_data.password
         )
 
@@ -54,7 +98,7 @@ class UserService:
         user_data_dict = user_data.model_dump()
 
         user_data_dict["password_hash"] = \
-            pwd_hashing.generate_password_hash(
+            await pwd_hashing.generate_password_hash(
                 user_data.password
         )
 
@@ -70,13 +114,18 @@ class UserService:
                 status_code=status.HTTP_403_FORBIDDEN
             )
 
-        if not pwd_hashing.verify_password(user_data.password,
-                                           user.password_hash):
+        valid, new_hash = await pwd_hashing.verify_and_update(
+            user_data.password, user.password_hash
+        )
+        if not valid:
             raise HTTPException(
                 detail="Invalid Username or Password",
                 status_code=status.HTTP_403_FORBIDDEN
             )
 
+        if new_hash:
+            await user.set({"password_hash": new_hash})
+
         payload = {
             "email": user.email,
             "user_id": str(user.id),
@@ -126,9 +175,11 @@ class UserService:
         filters = {
             "deleted_at": None,
         }
-        users = await User.find(filters).to_list()
 
-        return [await UserReadSchema.from_mongo(user) for user in users]
+        return await User.aggregate([
+            {"$match": filters},
+            {"$project": USER_PROJECTION},
+        ]).to_list()
 
     async def get_user_by_id(self, user_id: str):
         user = await User.get(PydanticObjectId(user_id))
@@ -149,6 +200,7 @@ class UserService:
         user.deleted_at = datetime.now(timezone.utc)
 
         await user.save()
+        await self.invalidate_principal(user.id)
 
         return {"message": "User deleted"}
 
@@ -165,6 +217,7 @@ class UserService:
         user_data_dict["updated_at"] = datetime.now(timezone.utc)
 
         await user.set(user_data_dict)
+        await self.invalidate_principal(user.id)
 
         return await UserReadSchema.from_mongo(user)
 
@@ -174,6 +227,12 @@ class UserService:
         payload = jwt_bearer_token.decode_token(
             refresh_token, token_type="refresh")
 
+        if await token_blocklist.is_revoked(payload.get("jti")):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked. Please log in again."
+            )
+
         user_id = payload.get("sub")
         user = await User.get(PydanticObjectId(user_id))
 
@@ -212,6 +271,29 @@ class UserService:
 
         return {"message": "Access token refreshed"}
 
+    async def logout_user(self, tokens: list[str], response: Response):
+        """Revoke every still-valid token the client presented and clear
+        the auth cookies."""
+        from redis.exceptions import RedisError
+
+        for token in tokens:
+            try:
+                payload = jwt_bearer_token.decode_token(token)
+            except HTTPException:
+                continue
+            try:
+                await token_blocklist.revoke(payload["jti"], payload["exp"])
+            except RedisError as e:
+                logger.warning("Token revocation failed: %s", e)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Could not log out. Please try again."
+                )
+
+        response.delete_cookie(key="access_token", path="/")
+        response.delete_cookie(key="refresh_token", path="/")
+        return {"detail": "Logged out successfully"}
+
     async def password_reset_request(self,
                                      email_data: PasswordResetRequestModel,
                                      bg_tasks: BackgroundTasks):
@@ -270,12 +352,14 @@ class UserService:
                     status_code=status.HTTP_404_NOT_FOUND
                 )
 
-            passwd_hash = pwd_hashing.generate_password_hash(new_password)
+            passwd_hash = await pwd_hashing.generate_password_hash(
+                new_password)
 
             await user.set({
-                "hashed_password": passwd_hash,
+                "password_hash": passwd_hash,
                 "updated_at": datetime.now(timezone.utc),
             })
+            await self.invalidate_principal(user.id)
 
             return JSONResponse(
                 content={"message": "Password reset Successfully"},
@@ -1,18 +1,24 @@
+import functools
 import logging
 from datetime import datetime, timezone
-import cloudinary.uploader
-import cloudinary
 from fastapi import UploadFile
 
 from src.core.config import Config
 
 
-cloudinary.config(
-    cloud_name=Config.CLOUDINARY_CLOUD_NAME,
-    api_key=Config.CLOUDINARY_API_KEY,
-    api_secret=Config.CLOUDINARY_API_SECRET,
-    secure=True
-)
+@functools.cache
+def get_uploader():
+    """Import and configure the Cloudinary SDK on the first upload."""
+    import cloudinary
+    import cloudinary.uploader
+
+    cloudinary.config(
+        cloud_name=Config.CLOUDINARY_CLOUD_NAME,
+        api_key=Config.CLOUDINARY_API_KEY,
+        api_secret=Config.CLOUDINARY_API_SECRET,
+        secure=True
+    )
+    return cloudinary.uploader
 
 
 async def upload_to_cloudinary(file: UploadFile, slug, subfolder,
@@ -25,7 +31,7 @@ async def upload_to_cloudinary(file: UploadFile, slug, subfolder,
 
         ts = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
         public_id = f"{slug}_{ts}"
-        upload_result = cloudinary.uploader.upload(
+        upload_result = get_uploader().upload(
             file.file,
             folder=f"psn_website/{subfolder}",
             public_id=public_id,
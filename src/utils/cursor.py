@@ -0,0 +1,32 @@
+import base64
+import binascii
+
+from bson import json_util
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values) -> str:
+    raw = json_util.dumps(list(values)).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: tuple) -> list:
+    """Decode a cursor holding one value of each of `types`, in order.
+
+    Cursors come back from clients unsigned, so anything else (including
+    a dict that would act as a query operator) is rejected.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        values = None
+
+    if (not isinstance(values, list) or len(values) != len(types)
+            or not all(isinstance(value, expected)
+                       for value, expected in zip(values, types))):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return values
@@ -1,4 +1,3 @@
-import httpx
 from fastapi import BackgroundTasks
 
 from src.core.config import Config
@@ -21,6 +20,9 @@ async def send_resend_email(to: str, subject: str, html: str):
         "html": html,
     }
 
+    # httpx is only needed once an email is actually sent.
+    import httpx
+
     async with httpx.AsyncClient() as client:
         response = await client.post(RESEND_API_URL, json=payload,
                                      headers=headers)
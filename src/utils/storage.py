@@ -0,0 +1,140 @@
+import os
+import tempfile
+from typing import Optional
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from src.core.config import Config
+
+
+class LocalFileStorage:
+    """Stores generated artifacts under a directory on local disk.
+
+    Only the process (or Lambda container) that wrote an artifact can
+    serve it, so this suits local development and single-host setups.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def bind(self, database) -> None:
+        pass
+
+    def path_for(self, key: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.realpath(self.root) + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def prepare(self, key: str) -> str:
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    async def save(self, key: str, path: str) -> None:
+        pass
+
+    async def discard(self, key: str, path: str) -> None:
+        await self.delete(key)
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(self.path_for(key))
+
+    async def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path_for(key))
+        except FileNotFoundError:
+            pass
+
+    async def response(self, key: str, media_type: str,
+                       filename: str) -> Optional[Response]:
+        if not await self.exists(key):
+            return None
+        return FileResponse(self.path_for(key), media_type=media_type,
+                            filename=filename)
+
+
+class GridFSStorage:
+    """Stores generated artifacts in a MongoDB GridFS bucket, so any
+    process can serve what another one wrote.
+
+    Artifacts are written to a local temporary file first (`prepare`)
+    and uploaded by `save`, which removes the local copy.
+    """
+
+    def __init__(self, bucket_name: str):
+        self.bucket_name = bucket_name
+        self.bucket = None
+
+    def bind(self, database) -> None:
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+        self.bucket = AsyncIOMotorGridFSBucket(
+            database, bucket_name=self.bucket_name
+        )
+
+    def prepare(self, key: str) -> str:
+        handle, path = tempfile.mkstemp(prefix=f"{self.bucket_name}-",
+                                        suffix=os.path.splitext(key)[1])
+        os.close(handle)
+        return path
+
+    async def save(self, key: str, path: str) -> None:
+        await self.delete(key)
+        try:
+            with open(path, "rb") as source:
+                await self.bucket.upload_from_stream(key, source)
+        finally:
+            os.remove(path)
+
+    async def discard(self, key: str, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    async def _file_ids(self, key: str) -> list:
+        cursor = self.bucket.find({"filename": key}, projection={"_id": 1})
+        return [doc._id async for doc in cursor]
+
+    async def exists(self, key: str) -> bool:
+        return bool(await self._file_ids(key))
+
+    async def delete(self, key: str) -> None:
+        for file_id in await self._file_ids(key):
+            await self.bucket.delete(file_id)
+
+    async def response(self, key: str, media_type: str,
+                       filename: str) -> Optional[Response]:
+        from gridfs.errors import NoFile
+
+        try:
+            grid_out = await self.bucket.open_download_stream_by_name(key)
+        except NoFile:
+            return None
+
+        async def chunks():
+            while chunk := await grid_out.readchunk():
+                yield chunk
+
+        return StreamingResponse(
+            chunks(),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f"attachment; filename={filename}",
+                "Content-Length": str(grid_out.length),
+            },
+        )
+
+
+def create_storage(backend: str, root: str, bucket_name: str):
+    if backend == "gridfs":
+        return GridFSStorage(bucket_name)
+    return LocalFileStorage(root)
+
+
+export_storage = create_storage(Config.EXPORT_STORAGE_BACKEND,
+                                Config.EXPORT_STORAGE_DIR,
+                                Config.EXPORT_STORAGE_BUCKET)
+profile_storage = create_storage(Config.PROFILE_STORAGE_BACKEND,
+                                 Config.PROFILE_STORAGE_DIR,
+                                 Config.PROFILE_STORAGE_BUCKET)
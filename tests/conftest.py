@@ -0,0 +1,24 @@
+import os
+
+# Settings the app requires at import time; the tests never reach the
+# services behind them.
+REQUIRED_SETTINGS = {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "JWT_SECRET": "test-secret-with-at-least-32-bytes!!",
+    "JWT_ALGORITHM": "HS256",
+    "MAIL_USERNAME": "test",
+    "MAIL_PASSWORD": "test",
+    "MAIL_FROM": "test@example.com",
+    "MAIL_PORT": "587",
+    "MAIL_SERVER": "localhost",
+    "MAIL_FROM_NAME": "test",
+    "RESEND_API_KEY": "test",
+    "MAIL_FROM_RESEND": "test@example.com",
+    "CLOUDINARY_CLOUD_NAME": "test",
+    "CLOUDINARY_API_KEY": "test",
+    "CLOUDINARY_API_SECRET": "test",
+    "FRONTEND_DOMAIN": "http://localhost:3000",
+}
+
+for key, value in REQUIRED_SETTINGS.items():
+    os.environ.setdefault(key, value)
@@ -0,0 +1,60 @@
+import base64
+from datetime import datetime
+
+import pytest
+from bson import ObjectId, json_util
+from fastapi import HTTPException
+
+from src.utils.cursor import decode_cursor, encode_cursor
+
+NEWS_CURSOR = (datetime, ObjectId)
+
+
+def raw_cursor(payload: str) -> str:
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def test_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30)
+    last_id = ObjectId()
+
+    cursor = encode_cursor(created_at, last_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, NEWS_CURSOR) == [created_at, last_id]
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64 at all!",
+    raw_cursor("{not json"),
+    raw_cursor('{"a": 1}'),
+    raw_cursor("[]"),
+    "éééé",
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, NEWS_CURSOR)
+    assert exc.value.status_code == 400
+
+
+def test_wrong_number_of_values_is_rejected():
+    cursor = encode_cursor(ObjectId())
+
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, NEWS_CURSOR)
+
+
+def test_wrong_value_types_are_rejected():
+    cursor = encode_cursor("2024-05-01", str(ObjectId()))
+
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, NEWS_CURSOR)
+
+
+def test_tampered_operator_is_rejected():
+    # Would become {"_id": {"$gt": {"$ne": None}}} style filters.
+    payload = json_util.dumps([{"$ne": None}])
+
+    with pytest.raises(HTTPException):
+        decode_cursor(raw_cursor(payload), (ObjectId,))
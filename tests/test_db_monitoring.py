@@ -0,0 +1,67 @@
+import logging
+from types import SimpleNamespace
+
+from src.db import monitoring
+from src.db.indexes import QueryShape
+from src.db.monitoring import SlowQueryListener, filter_shape, shape_fields
+
+
+def test_filter_shape_replaces_literals_and_keeps_operators():
+    query = {
+        "technical_group": "Hospital",
+        "_id": {"$gt": "652c1e6fcf9b7f001f3f5a2b"},
+        "interest_groups": {"$in": ["Research", "Oncology"]},
+        "$or": [{"place_of_work": "Uyo"}, {"induction_year": 2010}],
+    }
+
+    assert filter_shape(query) == {
+        "technical_group": "?",
+        "_id": {"$gt": "?"},
+        "interest_groups": {"$in": "?"},
+        "$or": [{"place_of_work": "?"}, {"induction_year": "?"}],
+    }
+
+
+def test_filter_shape_of_empty_and_scalar_values():
+    assert filter_shape({}) == {}
+    assert filter_shape([]) == "?"
+    assert filter_shape(None) == "?"
+
+
+def test_shape_fields_flattens_logical_operators():
+    query = {"$and": [{"tags": {"$in": ["a"]}}, {"_id": {"$ne": 1}}],
+             "$text": {"$search": "x"}, "group": "general"}
+
+    assert shape_fields(query) == ("tags", "_id", "$text", "group")
+
+
+def event(name, request_id, command=None, reply=None, duration_ms=0):
+    return SimpleNamespace(
+        command_name=name, command=command or {}, reply=reply or {},
+        database_name="psn_aks", connection_id=("localhost", 27017),
+        request_id=request_id, duration_micros=int(duration_ms * 1000),
+    )
+
+
+def test_slow_get_more_is_logged_with_the_cursor_filter(
+        caplog, monkeypatch):
+    observed = set()
+    monkeypatch.setattr(monitoring, "observed_shapes", observed)
+    listener = SlowQueryListener()
+
+    listener.started(event("find", 1, {
+        "find": "news", "filter": {"group": "general"},
+    }))
+    listener.succeeded(event("find", 1, reply={"cursor": {"id": 42}}))
+
+    with caplog.at_level(logging.WARNING, logger="psnaks"):
+        listener.started(event("getMore", 2, {
+            "getMore": 42, "collection": "news",
+        }))
+        listener.succeeded(event("getMore", 2, reply={"cursor": {"id": 0}},
+                                 duration_ms=500))
+
+    assert 'Slow query getMore psn_aks.news' in caplog.text
+    assert '{"group": "?"}' in caplog.text
+    assert observed == {QueryShape("news", ("group",), "slow query")}
+    assert not listener._cursors
@@ -0,0 +1,13 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.news.services import news_svc
+
+
+@pytest.mark.parametrize("q", ['"', '""', ' " " '])
+def test_phrase_of_only_quotes_is_rejected(q):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(news_svc.search_news(q, phrase=True))
+    assert exc.value.status_code == 422
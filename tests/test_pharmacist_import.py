@@ -0,0 +1,74 @@
+import asyncio
+import io
+
+from fastapi import UploadFile
+
+from src.pharmacists import imports
+from src.pharmacists.imports import pharmacist_import_svc
+from src.pharmacists.models import Pharmacist
+
+HEADER = ("email,full_name,pcn_license_number,induction_year,"
+          "technical_group,gender,phone_number\n")
+
+
+def upload(body: str) -> UploadFile:
+    return UploadFile(io.BytesIO((HEADER + body).encode()),
+                      filename="pharmacists.csv")
+
+
+def run_import(monkeypatch, body: str):
+    written = []
+
+    async def write_batch(batch, report):
+        written.extend(batch)
+        report.inserted += len(batch)
+
+    async def noop(*args):
+        pass
+
+    # Document.__init__ looks up its collection, which needs a database.
+    monkeypatch.setattr(Pharmacist, "get_pymongo_collection",
+                        classmethod(lambda cls: None))
+    monkeypatch.setattr(pharmacist_import_svc, "write_batch", write_batch)
+    monkeypatch.setattr(imports.list_versions, "bump", noop)
+    monkeypatch.setattr(imports.pharmacist_stats_svc, "refresh", noop)
+    monkeypatch.setattr(imports.pharmacist_search_index,
+                        "schedule_rebuild", lambda: None)
+
+    report = asyncio.run(
+        pharmacist_import_svc.import_pharmacists(upload(body))
+    )
+    return report, written
+
+
+def test_rows_missing_document_fields_are_reported(monkeypatch):
+    report, written = run_import(monkeypatch, (
+        "a@example.com,Ada,PCN1,2010,Hospital,F,0801\n"
+        ",Bola,PCN2,2011,Hospital,M,0802\n"
+        "c@example.com,Chi,PCN3,2012,Hospital,F,\n"
+    ))
+
+    assert report.total_rows == 3
+    assert report.inserted == 1
+    assert report.failed == 2
+    assert [doc["pcn_license_number"] for _, doc in written] == ["PCN1"]
+
+    errors = {e.row: e for e in report.errors}
+    assert errors[2].pcn_license_number == "PCN2"
+    assert any(m.startswith("email") for m in errors[2].errors)
+    assert any(m.startswith("phone_number") for m in errors[3].errors)
+
+
+def test_invalid_and_repeated_rows_are_reported(monkeypatch):
+    report, written = run_import(monkeypatch, (
+        "a@example.com,Ada,PCN1,2010,Hospital,F,0801\n"
+        "not-an-email,Bola,PCN2,2011,Hospital,M,0802\n"
+        "c@example.com,Chi,PCN3,soon,Hospital,F,0803\n"
+        "d@example.com,Dayo,PCN1,2013,Hospital,M,0804\n"
+    ))
+
+    assert report.inserted == 1
+    assert report.failed == 3
+    assert sorted(e.row for e in report.errors) == [2, 3, 4]
+    assert not report.errors_truncated
+    assert len(written) == 1
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+from redis.exceptions import RedisError
+
+from src.core.config import Config
+from src.db.redis import TokenBlocklist
+
+
+def blocklists(count: int, server=None):
+    server = server or fakeredis.FakeServer()
+    return [TokenBlocklist(fakeredis.FakeAsyncRedis(server=server))
+            for _ in range(count)]
+
+
+async def wait_until(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+def test_revocation_reaches_a_subscribed_instance():
+    async def scenario():
+        revoker, other = blocklists(2)
+        await other.start()
+        try:
+            assert not await other.is_revoked("jti-1")
+            await revoker.revoke("jti-1", time.time() + 60)
+            assert await wait_until(
+                lambda: other._is_revoked_locally("jti-1")
+            )
+            assert await other.is_revoked("jti-1")
+        finally:
+            await other.stop()
+
+    asyncio.run(scenario())
+
+
+def test_first_check_starts_the_blocklist():
+    async def scenario():
+        revoker, other = blocklists(2)
+        await revoker.revoke("jti-1", time.time() + 60)
+
+        try:
+            assert await other.is_revoked("jti-1")
+            assert other._is_current()
+        finally:
+            await other.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stale_instance_checks_redis():
+    async def scenario():
+        [blocklist] = blocklists(1)
+        await blocklist.start()
+        try:
+            # Written without a publish, so only Redis knows about it.
+            await blocklist.client.set("blocklist:jti-1", "", ex=60)
+            assert not await blocklist.is_revoked("jti-1")
+
+            # e.g. a Lambda container thawed after its resync was due
+            blocklist._synced_at = 0
+            assert await blocklist.is_revoked("jti-1")
+            assert not await blocklist.is_revoked("jti-2")
+        finally:
+            await blocklist.stop()
+
+    asyncio.run(scenario())
+
+
+def test_sync_loads_earlier_revocations():
+    async def scenario():
+        revoker, other = blocklists(2)
+        await revoker.revoke("jti-1", time.time() + 60)
+
+        await other.start()
+        try:
+            assert other._is_current()
+            assert other._is_revoked_locally("jti-1")
+        finally:
+            await other.stop()
+
+    asyncio.run(scenario())
+
+
+def test_tokens_are_rejected_when_redis_is_unreachable(monkeypatch):
+    monkeypatch.setattr(Config, "BLOCKLIST_SYNC_TIMEOUT_SECONDS", 0.05)
+
+    async def scenario():
+        server = fakeredis.FakeServer()
+        [blocklist] = blocklists(1, server)
+        server.connected = False
+
+        try:
+            assert await blocklist.is_revoked("jti-1")
+        finally:
+            await blocklist.stop()
+
+    asyncio.run(scenario())
+
+
+def test_revoke_raises_when_redis_is_unreachable():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        [blocklist] = blocklists(1, server)
+        server.connected = False
+
+        with pytest.raises(RedisError):
+            await blocklist.revoke("jti-1", time.time() + 60)
+
+    asyncio.run(scenario())
@@ -0,0 +1,45 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.security import VerifiedTokenCache
+
+
+def test_expired_entries_are_dropped():
+    cache = VerifiedTokenCache(max_entries=4)
+    key = cache.key("token")
+    cache.set(key, {"exp": time.time() - 1})
+
+    assert cache.get(key) is None
+    assert not cache._entries
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = VerifiedTokenCache(max_entries=2)
+    exp = time.time() + 60
+    a, b, c = (cache.key(t) for t in "abc")
+
+    cache.set(a, {"exp": exp})
+    cache.set(b, {"exp": exp})
+    cache.get(a)
+    cache.set(c, {"exp": exp})
+
+    assert cache.get(b) is None
+    assert cache.get(a) is not None
+
+
+def test_concurrent_access_from_threads():
+    # A small cache keeps evicting, so unlocked gets race with popitem.
+    cache = VerifiedTokenCache(max_entries=8)
+    keys = [cache.key(str(i)) for i in range(32)]
+    exp = time.time() + 60
+
+    def hammer(offset: int) -> None:
+        for i in range(5000):
+            key = keys[(i + offset) % len(keys)]
+            cache.set(key, {"exp": exp})
+            cache.get(keys[(i * 7 + offset) % len(keys)])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(hammer, range(8)))
+
+    assert len(cache._entries) <= 8